@@ -11,7 +11,7 @@ from jose import jwt, JWTError
 
 from database import get_db
 from schemas import user_schema
-from models import user_model
+from user_cache import user_cache
 import crud
 import utils
 
@@ -51,10 +51,26 @@ def authenticate_user(db: Session, email: str, password: str):
     user = crud.get_user_by_email(db, email)
     if not user:
         return False
-    if not utils.verify_password(password, user.hashed_password):
+    verified, new_hash = utils.verify_and_update_password(password, user.hashed_password)
+    if not verified:
         return False
+    # 해시 설정이 바뀐 경우 로그인 시점에 새 해시로 교체
+    if new_hash:
+        crud.update_password_hash(db, db_user=user, hashed_password=new_hash)
     return user
 
+# 토큰 subject(email)로 사용자 조회 (캐시 우선)
+def _load_principal(db: Session, email: str):
+    """캐시된 사용자 스냅샷 반환, 없으면 DB 조회 후 캐시 (ORM 객체가 아닌 UserResponse)"""
+    principal = user_cache.get(email)
+    if principal is None:
+        db_user = crud.get_user_by_email(db, email=email)
+        if db_user is None:
+            return None
+        principal = user_schema.UserResponse.model_validate(db_user, from_attributes=True)
+        user_cache.set(email, principal)
+    return principal
+
 # 로그인 사용자 정보
 def get_current_user(
     access_token: Annotated[str | None, Cookie()] = None,
@@ -79,7 +95,7 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = crud.get_user_by_email(db, email=token_data.email)
+    user = _load_principal(db, email=token_data.email)
     if user is None:
         raise credentials_exception
     
@@ -108,14 +124,14 @@ def get_current_user_from_refresh_token(
     except JWTError:
         raise credentials_exception
     
-    user = crud.get_user_by_email(db, email=token_data.email)
+    user = _load_principal(db, email=token_data.email)
     if user is None:
         raise credentials_exception
     
     return user
 
 # 유저가 활성 상태인지 확인
-def get_current_active_user(current_user: Annotated[user_model.User, Depends(get_current_user)]):
+def get_current_active_user(current_user: Annotated[user_schema.UserResponse, Depends(get_current_user)]):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="비활성화된 사용자입니다.")
     return current_user
\ No newline at end of file
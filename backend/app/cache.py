@@ -0,0 +1,65 @@
+# 프로세스 내 메모리 캐시
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """TTL 만료 + LRU 제거 방식의 스레드 안전 메모리 캐시 (최대 maxsize 개 유지)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict() # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+
+    def _get_live(self, key, now: float):
+        """만료되지 않은 항목 반환 (만료된 항목은 제거), lock 안에서 호출"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[0] <= now:
+            del self._data[key]
+            return None
+        return item
+
+    def _evict(self):
+        """maxsize 를 넘으면 가장 오래 사용되지 않은 항목부터 제거, lock 안에서 호출"""
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._get_live(key, time.monotonic())
+            if item is None:
+                return default
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, ttl: float | None = None):
+        with self._lock:
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            self._evict()
+
+    def add(self, key, value, ttl: float | None = None) -> bool:
+        """살아있는 항목이 없을 때만 저장하고 True, 이미 있으면 False"""
+        with self._lock:
+            now = time.monotonic()
+            if self._get_live(key, now) is not None:
+                return False
+            self._data[key] = (now + (self.ttl if ttl is None else ttl), value)
+            self._evict()
+            return True
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,84 @@
+# 카테고리 캐시
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas import category_schema
+import queries
+
+load_dotenv()
+
+# 카테고리 목록을 다시 읽어오는 주기 (초)
+CATEGORY_CACHE_TTL_SECONDS = float(os.getenv("CATEGORY_CACHE_TTL_SECONDS", 300))
+
+class CategoryCache:
+    """카테고리 전체를 메모리에 두고 ID/이름으로 조회하는 캐시
+
+    TTL 이 지나거나 invalidate() 되면 다음 조회 때 전체를 다시 읽어옴 (카테고리는 수 개뿐)
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._categories: list[category_schema.CategoryResponse] = []
+        self._by_id: dict[int, category_schema.CategoryResponse] = {}
+        self._by_name: dict[str, category_schema.CategoryResponse] = {}
+        self._expires_at = 0.0
+
+    def _store(self, categories):
+        items = [category_schema.CategoryResponse.model_validate(c, from_attributes=True) for c in categories]
+        with self._lock:
+            self._categories = items
+            self._by_id = {item.category_id: item for item in items}
+            self._by_name = {item.name: item for item in items}
+            self._expires_at = time.monotonic() + self.ttl
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self._expires_at
+
+    def invalidate(self):
+        """카테고리 변경 시 호출 - 다음 조회 때 다시 로딩"""
+        self._expires_at = 0.0
+
+    # ----- 동기 세션 -----
+    def load(self, db: Session):
+        self._store(db.scalars(queries.all_categories()).all())
+
+    def get_all(self, db: Session):
+        if not self.is_fresh():
+            self.load(db)
+        return self._categories
+
+    def get(self, db: Session, category_id: int):
+        if not self.is_fresh():
+            self.load(db)
+        return self._by_id.get(category_id)
+
+    def get_by_name(self, db: Session, name: str):
+        if not self.is_fresh():
+            self.load(db)
+        return self._by_name.get(name)
+
+    # ----- 비동기 세션 -----
+    async def aload(self, db: AsyncSession):
+        self._store((await db.scalars(queries.all_categories())).all())
+
+    async def aget_all(self, db: AsyncSession):
+        if not self.is_fresh():
+            await self.aload(db)
+        return self._categories
+
+    async def aget(self, db: AsyncSession, category_id: int):
+        if not self.is_fresh():
+            await self.aload(db)
+        return self._by_id.get(category_id)
+
+    async def aget_by_name(self, db: AsyncSession, name: str):
+        if not self.is_fresh():
+            await self.aload(db)
+        return self._by_name.get(name)
+
+category_cache = CategoryCache(CATEGORY_CACHE_TTL_SECONDS)
@@ -0,0 +1,123 @@
+# 응답 압축 미들웨어 - Accept-Encoding 에 따라 brotli / gzip 선택, 작은 응답과 이미 압축된 응답은 그대로 전송
+import os
+from dotenv import load_dotenv
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # 선택 의존성 (없으면 gzip 만 사용)
+except ImportError:
+    brotli = None
+
+load_dotenv()
+
+# 이 크기(바이트)보다 작은 응답은 압축하지 않음
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+# gzip 압축 레벨 (1~9, 높을수록 작지만 CPU 사용 증가)
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+# brotli 압축 품질 (0~11, 응답마다 압축하므로 중간값 사용)
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+
+# 이미 압축된 형식이라 다시 압축해도 줄지 않는 콘텐츠 타입 (+ 스트리밍 이벤트)
+_UNCOMPRESSIBLE_CONTENT_TYPES = (
+    "image/", "video/", "audio/", "font/woff",
+    "application/zip", "application/gzip", "application/x-brotli", "application/pdf",
+    "text/event-stream",
+)
+
+def _parse_accept_encoding(header: str) -> dict[str, float]:
+    """Accept-Encoding 을 {인코딩: q값} 으로 변환"""
+    encodings = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name] = q
+    return encodings
+
+def choose_encoding(header: str) -> str | None:
+    """클라이언트가 받을 수 있는 인코딩 중 q값이 가장 높은 것 (같으면 brotli 우선, 없으면 None)"""
+    accepted = _parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+class _SkipUncompressible:
+    """응답 시작 시 콘텐츠 타입을 보고 이미 압축된 형식이면 압축하지 않도록 표시"""
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            await super().send_with_compression(message)
+            if content_type.startswith(_UNCOMPRESSIBLE_CONTENT_TYPES):
+                self.content_type_is_excluded = True
+            return
+        await super().send_with_compression(message)
+
+class _IdentityResponder(_SkipUncompressible, IdentityResponder):
+    pass
+
+class _GZipResponder(_SkipUncompressible, GZipResponder):
+    pass
+
+class _BrotliResponder(_SkipUncompressible, IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        body = self.compressor.process(body)
+        # 스트리밍 응답은 조각마다 flush 해 클라이언트가 바로 풀 수 있게 함
+        return body + (self.compressor.flush() if more_body else self.compressor.finish())
+
+class CompressionMiddleware:
+    """gzip / brotli 응답 압축 (starlette GZipMiddleware 의 응답 처리 재사용)
+
+    - excluded_paths 로 시작하는 경로(정적 이미지 등)는 건드리지 않음
+    - minimum_size 보다 작은 응답, 이미 Content-Encoding 이 있는 응답, 이미지 등 압축된 형식은 그대로 전송
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        excluded_paths: tuple[str, ...] = (),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            responder = _BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif encoding == "gzip":
+            responder = _GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = _IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
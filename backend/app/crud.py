@@ -1,9 +1,18 @@
-import os
-from sqlalchemy.orm import Session, joinedload
+from collections import Counter
+from sqlalchemy import func, select, update, delete, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from schemas import user_schema, category_schema, product_schema
 from models import user_model, category_model, product_model
 from typing import List
+from queries import Cursor
+from category_cache import category_cache
+from user_cache import invalidate_user
+import queries
 import utils
+from file_cleanup import file_cleaner
+from response_cache import response_cache, PRODUCT_LIST_TAG, product_tag
 
 # ----- 회원 관련 ------
 def create_user(db: Session, user: user_schema.UserCreate):
@@ -40,6 +49,15 @@ def update_user(db: Session, db_user: user_model.User, user_update: user_schema.
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_user(db_user.email)
+    response_cache.clear() # 판매자 닉네임이 캐시된 상품 응답에 포함되어 있음
+    return db_user
+
+def update_password_hash(db: Session, db_user: user_model.User, hashed_password: str):
+    """저장된 비밀번호 해시 교체 (로그인 시 재해싱)"""
+    db_user.hashed_password = hashed_password
+    db.add(db_user)
+    db.commit()
     return db_user
 
 # ----- 카테고리 관련 ------
@@ -52,24 +70,27 @@ def create_category(db: Session, category: category_schema.CategoryCreate):
     db.add(new_category)
     db.commit()
     db.refresh(new_category)
+    category_cache.invalidate()
+    response_cache.invalidate(PRODUCT_LIST_TAG)
 
     return new_category
 
 def get_category(db: Session, category_id: int):
     """ID로 카테고리 조회"""
-    return db.query(category_model.Category).filter(category_model.Category.category_id == category_id).first()
+    return db.scalars(queries.category_by_id(category_id)).first()
 
 def get_category_by_name(db: Session, name: str):
     """이름으로 카테고리 조회"""
-    return db.query(category_model.Category).filter(category_model.Category.name == name).first()
+    return db.scalars(queries.category_by_name(name)).first()
 
 def get_all_categories(db: Session):
     """모든 카테고리 목록 조회"""
-    return db.query(category_model.Category).order_by(category_model.Category.category_id).all()
+    return db.scalars(queries.all_categories()).all()
 
 # ----- 상품 관련 -----
 def create_product(db: Session, product: product_schema.ProductCreate, seller_id: int):
-    """새상품 등록 (이미지 포함)"""
+    """새상품 등록 (이미지 포함, 한 트랜잭션)"""
+    representative = next(img for img in product.images if img.is_representative)
 
     new_product = product_model.Product(
         title=product.title,
@@ -77,103 +98,117 @@ def create_product(db: Session, product: product_schema.ProductCreate, seller_id
         price=product.price,
         trade_city=product.trade_city,
         trade_district=product.trade_district,
-        product_tag=product.product_tag.name,
+        product_tag=product_model.ProductTagEnum(product.product_tag.value),
         category_id=product.category_id,
-        seller_id=seller_id
+        seller_id=seller_id,
+        representative_image_url=representative.image_url,
+        # 이미지는 상품 INSERT 직후 한 번의 다중 행 INSERT 로 저장됨
+        images=[
+            product_model.ProductImage(image_url=img.image_url, is_representative=img.is_representative)
+            for img in product.images
+        ]
     )
-    
+
     db.add(new_product)
+    _acquire_images(db, [img.image_url for img in product.images])
     db.commit()
-    db.refresh(new_product)
-
-    new_images = []
-    for img in product.images:
-        new_img = product_model.ProductImage(
-            image_url=img.image_url,
-            is_representative=img.is_representative,
-            product_id=new_product.product_id
+    # created_at 등 서버 기본값은 eager_defaults 로 INSERT 시 함께 받아오므로 refresh 불필요
+    response_cache.invalidate(PRODUCT_LIST_TAG)
+
+    return new_product
+
+def _sync_representative_image(db_product: product_model.Product):
+    """이미지 목록의 대표 이미지를 products 의 비정규화 컬럼에 반영 (썸네일은 변환이 끝났으면 함께)"""
+    representative = next((img for img in db_product.images if img.is_representative), None)
+    image_url = representative.image_url if representative else None
+    if db_product.representative_image_url != image_url:
+        db_product.representative_image_url = image_url
+        db_product.representative_thumbnail_url = representative.thumbnail_url if representative else None
+
+def _acquire_images(db: Session, image_urls: List[str]):
+    """이미지 파일 참조 수 증가 (처음 참조되는 파일이면 행 생성)"""
+    counts = Counter(image_urls)
+    if not counts:
+        return
+
+    stmt = pg_insert(product_model.ImageFile).values(
+        [{"image_url": url, "ref_count": count} for url, count in sorted(counts.items())]
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[product_model.ImageFile.image_url],
+        set_={"ref_count": product_model.ImageFile.ref_count + stmt.excluded.ref_count}
+    ))
+
+def _release_images(db: Session, image_urls: List[str]) -> List[str]:
+    """이미지 파일 참조 수 감소 후, 더 이상 참조되지 않는 파일의 행을 지우고 그 URL 목록 반환
+
+    파일 자체는 커밋이 끝난 뒤 file_cleaner.enqueue 로 삭제를 맡겨야 함
+    """
+    counts = Counter(image_urls)
+    if not counts:
+        return []
+
+    # 행 잠금 순서를 고정해 동시 수정 간 교착 방지
+    db.connection().execute(
+        update(product_model.ImageFile)
+        .where(product_model.ImageFile.image_url == bindparam("b_url"))
+        .values(ref_count=product_model.ImageFile.ref_count - bindparam("b_count")),
+        [{"b_url": url, "b_count": count} for url, count in sorted(counts.items())]
+    )
+    return db.scalars(
+        delete(product_model.ImageFile)
+        .where(
+            product_model.ImageFile.image_url.in_(counts.keys()),
+            product_model.ImageFile.ref_count <= 0
         )
-        new_images.append(new_img)
+        .returning(product_model.ImageFile.image_url)
+    ).all()
 
-    db.add_all(new_images)
-    db.commit()
-    db.refresh(new_product)
+def _load_page(db: Session, stmt, skip: int, limit: int, cursor: Cursor, representative_only: bool = False, rank=None):
+    """2단계 목록 로딩: 1) 페이지의 상품 ID만 조회 2) ID 목록으로 상품과 이미지를 일괄 로딩"""
+    page_ids = db.scalars(queries.page_ids(stmt, skip, limit, cursor, rank)).all()
+    if not page_ids:
+        return []
 
-    return new_product
+    products = db.scalars(queries.products_by_ids(page_ids, representative_only)).all()
+    return queries.order_by_ids(products, page_ids)
 
 def get_product(db: Session, product_id: int):
     """ID로 상품 조회"""
-    return db.query(product_model.Product)\
-        .options(
-            joinedload(product_model.Product.seller),
-            joinedload(product_model.Product.category),
-            joinedload(product_model.Product.images)
-        )\
-        .filter(product_model.Product.product_id == product_id)\
-        .first()
+    return db.scalars(queries.product_detail(product_id)).first()
 
-def get_all_product(db: Session, skip: int = 0, limit: int = 16):
+def get_all_product(db: Session, skip: int = 0, limit: int = 16, cursor: Cursor = None, representative_only: bool = False):
     """상품 전체 조회"""
-    return db.query(product_model.Product)\
-        .options(
-            joinedload(product_model.Product.seller),
-            joinedload(product_model.Product.category),
-            joinedload(product_model.Product.images)
-        )\
-        .order_by(product_model.Product.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    return _load_page(db, queries.all_products(), skip, limit, cursor, representative_only)
 
-def get_products_by_category(db: Session, category_id: int, skip: int = 0, limit: int = 16):
+def get_products_by_category(db: Session, category_id: int, skip: int = 0, limit: int = 16, cursor: Cursor = None, representative_only: bool = False):
     """카테고리별 상품 목록 조회"""
-    return db.query(product_model.Product)\
-        .options(
-            joinedload(product_model.Product.seller),
-            joinedload(product_model.Product.category),
-            joinedload(product_model.Product.images)
-        )\
-        .filter(product_model.Product.category_id == category_id)\
-        .order_by(product_model.Product.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    return _load_page(db, queries.products_by_category(category_id), skip, limit, cursor, representative_only)
 
-def get_products_by_category_name(db: Session, category_name: str, skip: int = 0, limit: int = 16):
+def get_products_by_category_name(db: Session, category_name: str, skip: int = 0, limit: int = 16, cursor: Cursor = None, representative_only: bool = False):
     """카테고리 이름으로 상품 목록 조회"""
-    category = get_category_by_name(db, name=category_name)
+    category = category_cache.get_by_name(db, category_name)
     if not category:
         return []
 
-    return db.query(product_model.Product)\
-        .options(
-            joinedload(product_model.Product.seller),
-            joinedload(product_model.Product.category),
-            joinedload(product_model.Product.images)
-        )\
-        .filter(product_model.Product.category_id == category.category_id)\
-        .order_by(product_model.Product.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-
-def get_products_by_user(db: Session, user_id: int):
-    """특정 사용자가 등록한 모든 상품 목록 조회"""
-    return db.query(product_model.Product)\
-        .options(
-            joinedload(product_model.Product.seller),
-            joinedload(product_model.Product.category),
-            joinedload(product_model.Product.images)
-        )\
-        .filter(product_model.Product.seller_id == user_id)\
-        .order_by(product_model.Product.created_at.desc())\
-        .all()
+    return get_products_by_category(db, category.category_id, skip, limit, cursor, representative_only)
+
+def get_product_cards(db: Session, skip: int = 0, limit: int = 16, cursor: Cursor = None, category_id: int | None = None):
+    """상품 카드 목록 조회 (카테고리 지정 시 해당 카테고리만)"""
+    return db.execute(queries.paginate(queries.product_cards(category_id), skip, limit, cursor)).all()
+
+def get_products_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 16, cursor: Cursor = None, representative_only: bool = False):
+    """특정 사용자가 등록한 상품 목록 조회"""
+    return _load_page(db, queries.products_by_seller(user_id), skip, limit, cursor, representative_only)
+
+def get_user_product_versions(db: Session, user_id: int, skip: int = 0, limit: int = 16, cursor: Cursor = None):
+    """특정 사용자가 등록한 상품 목록 페이지의 ETag 용 버전"""
+    return db.execute(queries.page_versions(queries.products_by_seller(user_id), skip, limit, cursor)).all()
 
 def update_product(
     db: Session,
     db_product: product_model.Product,
-    product_update: product_schema.ProductUpdate,
-    images_to_delete: List[product_model.ProductImage] = [] # 삭제할 이미지 객체 목록 받기
+    product_update: product_schema.ProductUpdate
 ):
     """상품 정보 수정 (이미지 처리 포함)"""
     update_data = product_update.model_dump(exclude_unset=True)
@@ -189,88 +224,60 @@ def update_product(
             else:
                 setattr(db_product, key, value)
 
-    # 2. 이미지 처리
+    # 카테고리가 바뀌면 응답에 쓰일 관계도 함께 교체
+    if "category_id" in update_data and db_product.category.category_id != db_product.category_id:
+        db_product.category = db.get(category_model.Category, db_product.category_id)
+
+    # 2. 이미지 처리 - 기존 이미지와 URL 로 비교해 바뀐 행만 수정
+    unreferenced_urls = []
     if "images" in update_data:
         new_images_data = update_data["images"] # ProductImageCreate 스키마 리스트
 
-        # 2-1. 기존 이미지 레코드 삭제 (DB에서만)
-        # 실제 파일 삭제는 images_to_delete 리스트를 기반으로 아래에서 처리
-        db.query(product_model.ProductImage).filter(
-            product_model.ProductImage.product_id == db_product.product_id
-        ).delete(synchronize_session=False)
-
-        # 2-2. 새로운 이미지 레코드 추가 (DB에만)
-        new_db_images = []
+        # 2-1. 유지할 이미지는 기존 행을 그대로 쓰고 대표 여부만 갱신
+        remaining = list(db_product.images)
+        added_images = []
         for img_data in new_images_data:
-            if isinstance(img_data, dict):
-                new_db_img = product_model.ProductImage(
-                    image_url=img_data['image_url'],
-                    is_representative=img_data['is_representative'],
-                    product_id=db_product.product_id
-                )
-                new_db_images.append(new_db_img)
+            kept = next((img for img in remaining if img.image_url == img_data['image_url']), None)
+            if kept is not None:
+                remaining.remove(kept)
+                if kept.is_representative != img_data['is_representative']:
+                    kept.is_representative = img_data['is_representative']
             else:
-                # 예상치 못한 타입이 들어온 경우 로그 또는 오류 처리
-                print(f"Warning: Unexpected item type in new_images_data: {type(img_data)}")
-        if new_db_images:
-             db.add_all(new_db_images)
-
-    # 3. 삭제 대상 이미지 파일 시스템에서 삭제
-    for img_to_delete in images_to_delete:
-        # image_url에서 실제 파일 경로 생성 (URL 형식에 따라 조정 필요)
-        # 예시: image_url이 "/static/product_images/uuid.jpg" 형태라고 가정
-        if img_to_delete.image_url.startswith('/static/'):
-             # 프로젝트 루트 기준 상대 경로로 변경 (../ 제거)
-             relative_path = img_to_delete.image_url[len('/static/'):]
-             # ../static/ 구조에 맞게 실제 파일 경로 구성
-             file_path = os.path.join("..", "static", relative_path)
-             # 절대 경로로 변환 (선택 사항, 경로 설정에 따라 다름)
-             # file_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "static", relative_path))
-             print(f"Attempting to delete image file: {file_path}")
-             if os.path.exists(file_path):
-                 try:
-                     os.remove(file_path)
-                     print(f"Deleted image file: {file_path}")
-                 except OSError as e:
-                     print(f"Error deleting file {file_path}: {e}")
-             else:
-                 print(f"Image file not found, skipping deletion: {file_path}")
-        else:
-            print(f"Skipping deletion for image URL format: {img_to_delete.image_url}")
-
-
-    db.add(db_product) # 상품 정보 변경사항 추가
+                added_images.append(product_model.ProductImage(
+                    image_url=img_data['image_url'],
+                    is_representative=img_data['is_representative']
+                ))
+
+        # 2-2. 빠진 이미지는 컬렉션에서 제거 (delete-orphan 으로 행 삭제), 새 이미지는 추가
+        for removed in remaining:
+            db_product.images.remove(removed)
+        db_product.images.extend(added_images)
+        _sync_representative_image(db_product)
+        # 이미지만 바뀌어 상품 행이 수정되지 않는 경우에도 응답 버전(ETag)이 바뀌도록 수정 시각 갱신
+        db_product.updated_at = func.now()
+
+        # 2-3. 파일 참조 수 갱신 (실제 파일 삭제는 참조 수가 0 이 된 경우에만 커밋 후 처리)
+        _acquire_images(db, [img.image_url for img in added_images])
+        unreferenced_urls = _release_images(db, [img.image_url for img in remaining])
+
     try:
-        db.commit() # 모든 변경사항 (상품 정보, 이미지 레코드) 커밋
-        db.refresh(db_product) # 업데이트된 상품 정보 로드
-        db.refresh(db_product, attribute_names=['images', 'seller', 'category'])
+        db.commit() # 모든 변경사항 (상품 정보, 이미지 레코드) 한 번에 커밋
     except Exception as e:
         db.rollback() # 오류 발생 시 롤백
         print(f"Error during product update commit: {e}")
         # 적절한 예외 처리 또는 재 raise
         raise e
 
+    # 3. 더 이상 참조되지 않는 이미지 파일은 커밋 후 백그라운드에서 삭제
+    file_cleaner.enqueue(unreferenced_urls)
+    response_cache.invalidate(PRODUCT_LIST_TAG, product_tag(db_product.product_id))
+
     return db_product
 
 def delete_product(db: Session, db_product: product_model.Product):
-    """상품 삭제 (이미지 파일 포함)"""
-    # 1. 연결된 이미지 파일 삭제
-    for image in db_product.images:
-        # 이미지 URL을 파일 시스템 경로로 변환 (update_product과 동일 로직)
-        if image.image_url.startswith('/static/'):
-             relative_path = image.image_url[len('/static/'):]
-             file_path = os.path.join("..", "static", relative_path)
-             print(f"Attempting to delete image file associated with product {db_product.product_id}: {file_path}")
-             if os.path.exists(file_path):
-                 try:
-                     os.remove(file_path)
-                     print(f"Deleted image file: {file_path}")
-                 except OSError as e:
-                     print(f"Error deleting file {file_path}: {e}")
-             else:
-                 print(f"Image file not found, skipping deletion: {file_path}")
-        else:
-             print(f"Skipping deletion for image URL format: {image.image_url}")
+    """상품 삭제 (더 이상 참조되지 않는 이미지 파일 포함)"""
+    # 1. 이미지 파일 참조 수 감소 (파일 삭제는 커밋 후 백그라운드에서)
+    unreferenced_urls = _release_images(db, [image.image_url for image in db_product.images])
 
     # 2. 연결된 좋아요(찜) 레코드 삭제 (선택 사항, DB 제약 조건에 따라 자동 삭제될 수도 있음)
     db.query(product_model.ProductLike).filter(product_model.ProductLike.product_id == db_product.product_id).delete(synchronize_session=False)
@@ -285,62 +292,107 @@ def delete_product(db: Session, db_product: product_model.Product):
         print(f"Error during product delete commit: {e}")
         raise e
 
-# ----- 찜 관련 -----
-def get_like(db: Session, user_id: int, product_id: int):
-    """특정 찜 정보 가져오기"""
-    return db.query(product_model.ProductLike).filter(
-        product_model.ProductLike.user_id == user_id,
-        product_model.ProductLike.product_id == product_id
-    ).first()
+    file_cleaner.enqueue(unreferenced_urls)
+    response_cache.invalidate(PRODUCT_LIST_TAG, product_tag(db_product.product_id))
 
+# ----- 찜 관련 -----
 def create_like(db: Session, user_id: int, product_id: int):
-    """상품 찜하기"""
-    db_product = get_product(db, product_id)
-    if not db_product:
+    """상품 찜하기 (찜 추가와 likes 증가를 한 문장으로 처리)
+
+    :return: 상품이 없으면 None, 새로 찜했으면 True, 이미 찜한 상품이면 False
+    """
+    inserted = pg_insert(product_model.ProductLike)\
+        .values(user_id=user_id, product_id=product_id)\
+        .on_conflict_do_nothing(constraint="_user_product_uc")\
+        .returning(product_model.ProductLike.product_id)\
+        .cte("inserted_like")
+
+    # 실제로 추가된 경우에만 likes 를 원자적으로 1 증가
+    stmt = update(product_model.Product)\
+        .where(product_model.Product.product_id.in_(select(inserted.c.product_id)))\
+        .values(likes=func.coalesce(product_model.Product.likes, 0) + 1)\
+        .returning(product_model.Product.product_id)\
+        .execution_options(synchronize_session=False)
+
+    try:
+        updated = db.execute(stmt).first()
+        db.commit()
+    except IntegrityError:
+        # 존재하지 않는 상품 (외래키 위반)
+        db.rollback()
         return None
+    if updated is not None:
+        # 목록의 찜 수는 TTL 이 지나면 갱신 (찜마다 모든 목록을 비우지 않도록 상세만 무효화)
+        response_cache.invalidate(product_tag(product_id))
+    return updated is not None
+
+def delete_like(db: Session, user_id: int, product_id: int):
+    """상품 찜 취소하기 (찜 삭제와 likes 감소를 한 문장으로 처리)
+
+    :return: 찜을 취소했으면 True, 찜하지 않은 상품이면 False
+    """
+    deleted = delete(product_model.ProductLike)\
+        .where(
+            product_model.ProductLike.user_id == user_id,
+            product_model.ProductLike.product_id == product_id
+        )\
+        .returning(product_model.ProductLike.product_id)\
+        .cte("deleted_like")
 
-    db_like = product_model.ProductLike(user_id=user_id, product_id=product_id)
-    db.add(db_like)
-    
-    # 상품의 likes 카운트 1 증가
-    db_product.likes += 1
-    db.add(db_product)
-    
-    db.commit()
-    db.refresh(db_like)
-    return db_like
+    # 실제로 삭제된 경우에만 likes 를 1 감소 (0보다 작아지지 않도록)
+    stmt = update(product_model.Product)\
+        .where(product_model.Product.product_id.in_(select(deleted.c.product_id)))\
+        .values(likes=func.greatest(func.coalesce(product_model.Product.likes, 0) - 1, 0))\
+        .returning(product_model.Product.product_id)\
+        .execution_options(synchronize_session=False)
 
-def delete_like(db: Session, db_like: product_model.ProductLike):
-    """상품 찜 취소하기"""
-    db_product = get_product(db, db_like.product_id)
-    
-    db.delete(db_like)
-    
-    # 상품의 likes 카운트 1 감소 (0보다 작아지지 않도록)
-    if db_product and db_product.likes > 0:
-        db_product.likes -= 1
-        db.add(db_product)
-        
+    updated = db.execute(stmt).first()
     db.commit()
-
-def get_liked_products_by_user(db: Session, user_id: int):
-    """사용자가 찜한 모든 상품 목록 조회"""
-    return db.query(product_model.Product).join(product_model.ProductLike).filter(
-        product_model.ProductLike.user_id == user_id
+    if updated is not None:
+        # 목록의 찜 수는 TTL 이 지나면 갱신 (찜마다 모든 목록을 비우지 않도록 상세만 무효화)
+        response_cache.invalidate(product_tag(product_id))
+    return updated is not None
+
+def get_liked_product_ids(db: Session, user_id: int, product_ids: List[int]):
+    """주어진 상품 중 사용자가 찜한 상품 ID 집합"""
+    rows = db.query(product_model.ProductLike.product_id).filter(
+        product_model.ProductLike.user_id == user_id,
+        product_model.ProductLike.product_id.in_(product_ids)
     ).all()
+    return {product_id for (product_id,) in rows}
+
+def get_liked_products_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 16, cursor: Cursor = None, representative_only: bool = False):
+    """사용자가 찜한 상품 목록 조회"""
+    return _load_page(db, queries.products_liked_by(user_id), skip, limit, cursor, representative_only)
+
+def get_liked_product_versions(db: Session, user_id: int, skip: int = 0, limit: int = 16, cursor: Cursor = None):
+    """사용자가 찜한 상품 목록 페이지의 ETag 용 버전 (찜 취소로 빠진 상품도 반영됨)"""
+    return db.execute(queries.page_versions(queries.products_liked_by(user_id), skip, limit, cursor)).all()
 
 # ----- 검색 관련 -----
-def search_products_by_title(db: Session, query: str, skip: int = 0, limit: int = 16):
-    """상품 제목으로 검색"""
-    search_query = f"%{query}%"
-    return db.query(product_model.Product)\
-        .options(
-            joinedload(product_model.Product.seller),
-            joinedload(product_model.Product.category),
-            joinedload(product_model.Product.images)
-        )\
-        .filter(product_model.Product.title.ilike(search_query))\
-        .order_by(product_model.Product.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
\ No newline at end of file
+def search_products(
+    db: Session,
+    query: str,
+    filters: product_schema.ProductSearchFilter,
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = None,
+    representative_only: bool = False
+):
+    """상품 검색 (제목/내용 + 필터)"""
+    stmt = queries.search_filter(queries.all_products(), query, filters)
+
+    return _load_page(db, stmt, skip, limit, cursor, representative_only, rank=queries.search_rank(query, filters))
+
+def search_product_cards(
+    db: Session,
+    query: str,
+    filters: product_schema.ProductSearchFilter,
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = None
+):
+    """상품 검색 (카드 목록)"""
+    stmt = queries.search_filter(queries.product_cards(), query, filters)
+
+    return db.execute(queries.paginate(stmt, skip, limit, cursor, rank=queries.search_rank(query, filters))).all()
\ No newline at end of file
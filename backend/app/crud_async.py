@@ -0,0 +1,90 @@
+# 읽기 전용 crud 의 비동기(AsyncSession) 버전 - 조회 쿼리는 queries 모듈을 crud 와 공유
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas import product_schema
+from queries import Cursor
+from category_cache import category_cache
+import queries
+
+# ----- 카테고리 관련 ------
+async def get_category(db: AsyncSession, category_id: int):
+    """ID로 카테고리 조회"""
+    return (await db.scalars(queries.category_by_id(category_id))).first()
+
+async def get_category_by_name(db: AsyncSession, name: str):
+    """이름으로 카테고리 조회"""
+    return (await db.scalars(queries.category_by_name(name))).first()
+
+async def get_all_categories(db: AsyncSession):
+    """모든 카테고리 목록 조회"""
+    return (await db.scalars(queries.all_categories())).all()
+
+# ----- 상품 관련 -----
+async def _load_page(db: AsyncSession, stmt, skip: int, limit: int, cursor: Cursor, representative_only: bool = False, rank=None):
+    """2단계 목록 로딩: 1) 페이지의 상품 ID만 조회 2) ID 목록으로 상품과 이미지를 일괄 로딩"""
+    page_ids = (await db.scalars(queries.page_ids(stmt, skip, limit, cursor, rank))).all()
+    if not page_ids:
+        return []
+
+    products = (await db.scalars(queries.products_by_ids(page_ids, representative_only))).all()
+    return queries.order_by_ids(products, page_ids)
+
+async def get_product(db: AsyncSession, product_id: int):
+    """ID로 상품 조회"""
+    return (await db.scalars(queries.product_detail(product_id))).first()
+
+async def get_all_product(db: AsyncSession, skip: int = 0, limit: int = 16, cursor: Cursor = None, representative_only: bool = False):
+    """상품 전체 조회"""
+    return await _load_page(db, queries.all_products(), skip, limit, cursor, representative_only)
+
+async def get_products_by_category(db: AsyncSession, category_id: int, skip: int = 0, limit: int = 16, cursor: Cursor = None, representative_only: bool = False):
+    """카테고리별 상품 목록 조회"""
+    return await _load_page(db, queries.products_by_category(category_id), skip, limit, cursor, representative_only)
+
+async def get_products_by_category_name(db: AsyncSession, category_name: str, skip: int = 0, limit: int = 16, cursor: Cursor = None, representative_only: bool = False):
+    """카테고리 이름으로 상품 목록 조회"""
+    category = await category_cache.aget_by_name(db, category_name)
+    if not category:
+        return []
+
+    return await get_products_by_category(db, category.category_id, skip, limit, cursor, representative_only)
+
+async def get_product_version(db: AsyncSession, product_id: int):
+    """상품 상세의 ETag 용 버전 (상품이 없으면 None)"""
+    return (await db.execute(queries.product_version(product_id))).first()
+
+async def get_product_versions(db: AsyncSession, skip: int = 0, limit: int = 16, cursor: Cursor = None, category_id: int | None = None):
+    """상품 목록 페이지의 ETag 용 버전 (카테고리 지정 시 해당 카테고리만)"""
+    stmt = queries.all_products() if category_id is None else queries.products_by_category(category_id)
+    return (await db.execute(queries.page_versions(stmt, skip, limit, cursor))).all()
+
+async def get_product_cards(db: AsyncSession, skip: int = 0, limit: int = 16, cursor: Cursor = None, category_id: int | None = None):
+    """상품 카드 목록 조회 (카테고리 지정 시 해당 카테고리만)"""
+    return (await db.execute(queries.paginate(queries.product_cards(category_id), skip, limit, cursor))).all()
+
+# ----- 검색 관련 -----
+async def search_products(
+    db: AsyncSession,
+    query: str,
+    filters: product_schema.ProductSearchFilter,
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = None,
+    representative_only: bool = False
+):
+    """상품 검색 (제목/내용 + 필터)"""
+    stmt = queries.search_filter(queries.all_products(), query, filters)
+
+    return await _load_page(db, stmt, skip, limit, cursor, representative_only, rank=queries.search_rank(query, filters))
+
+async def search_product_cards(
+    db: AsyncSession,
+    query: str,
+    filters: product_schema.ProductSearchFilter,
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = None
+):
+    """상품 검색 (카드 목록)"""
+    stmt = queries.search_filter(queries.product_cards(), query, filters)
+
+    return (await db.execute(queries.paginate(stmt, skip, limit, cursor, rank=queries.search_rank(query, filters)))).all()
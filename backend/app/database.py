@@ -2,8 +2,11 @@ import os
 from dotenv import load_dotenv
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from pool_metrics import TimedQueuePool, TimedAsyncQueuePool
+
 load_dotenv()
 
 DB_USER = os.getenv("DB_USER")
@@ -11,11 +14,50 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_NAME = os.getenv("DB_NAME")
 
+# 커넥션 풀 설정 (워커 수 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) 가 DB max_connections 를 넘지 않도록 설정)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))      # 커넥션 대기 최대 시간 (초)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))      # 커넥션 재생성 주기 (초, -1 이면 사용 안 함)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0)) # 0 이면 제한 없음
+
 SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+# 읽기 위주 라우트용 비동기 드라이버(asyncpg) URL
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# statement_timeout 은 드라이버별로 접속 옵션 형식이 다름
+connect_args = {}
+async_connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS > 0:
+    connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    async_connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=TimedQueuePool,
+    connect_args=connect_args,
+    **POOL_OPTIONS
+)
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
+    connect_args=async_connect_args,
+    **POOL_OPTIONS
+)
+
+# commit 후에도 객체를 expire 하지 않음 - 방금 쓴 객체를 응답할 때 다시 조회(refresh)하지 않도록
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+# 비동기 세션은 commit 후 속성 접근 시 암묵적 I/O가 일어나지 않도록 expire 하지 않음
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -25,12 +67,35 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def check_migrations():
+    """DB 스키마가 최신 마이그레이션(head)까지 적용되었는지 확인 (아니면 RuntimeError)
+
+    마이그레이션은 배포 단계에서 한 번만 실행 (워커마다 시작 시 실행하면 DDL 이 겹치고 락을 잡음)
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")))
+    with engine.connect() as conn:
+        current = set(MigrationContext.configure(conn).get_current_heads())
+    if current != set(script.get_heads()):
+        raise RuntimeError(
+            "DB 스키마가 최신 마이그레이션이 아닙니다. backend/app 에서 'alembic upgrade head' 를 먼저 실행하세요 "
+            "(alembic 도입 전 create_all 로 만든 DB 는 처음 한 번 'alembic stamp 0001' 후 실행)"
+        )
+
 def init_db():
     import crud
+    from category_cache import category_cache
     from schemas import category_schema
-    from models import user_model, category_model, product_model
 
-    Base.metadata.create_all(bind=engine)
+    # 스키마는 migrations/ 의 alembic 마이그레이션으로 관리 (배포 단계에서 alembic upgrade head)
+    check_migrations()
 
     db = SessionLocal()
 
@@ -57,5 +122,8 @@ def init_db():
                 )
                 crud.create_category(db, category=new_category)
                 # print(f" - '{cat_data['name']}' 카테고리 추가 완료")
+
+        # 시작 시 카테고리 캐시 적재
+        category_cache.load(db)
     finally:
         db.close()
\ No newline at end of file
@@ -0,0 +1,90 @@
+# 인덱스 점검 도구 - crud 가 쓰는 조회 쿼리를 EXPLAIN 해서 순차 스캔(Seq Scan)이 있으면 실패
+# 사용법 (backend/app 에서): python explain_queries.py [--verbose]
+import json
+import sys
+from datetime import datetime, timezone
+from sqlalchemy import select, text
+
+from database import engine
+from models import product_model
+from schemas import product_schema
+import queries
+
+def _query_plans():
+    """(이름, select 문) 목록 - crud / crud_async 가 실제로 실행하는 형태와 같게 구성"""
+    cursor = (datetime.now(timezone.utc), 1_000_000)
+    latest = product_schema.ProductSearchFilter()
+    relevance = product_schema.ProductSearchFilter(sort=product_schema.ProductSearchSort.RELEVANCE, category_id=1)
+
+    return [
+        ("category_by_id", queries.category_by_id(1)),
+        ("category_by_name", queries.category_by_name("디지털기기")),
+        ("all_categories", queries.all_categories()),
+        ("page_ids (offset)", queries.page_ids(queries.all_products(), 0, 16, None)),
+        ("page_ids (cursor)", queries.page_ids(queries.all_products(), 0, 16, cursor)),
+        ("page_ids by category", queries.page_ids(queries.products_by_category(1), 0, 16, cursor)),
+        ("page_ids by seller", queries.page_ids(queries.products_by_seller(1), 0, 16, cursor)),
+        ("page_ids liked by user", queries.page_ids(queries.products_liked_by(1), 0, 16, cursor)),
+        ("products_by_ids", queries.products_by_ids([1, 2, 3])),
+        # selectinload 가 products_by_ids / product_detail 뒤에 실행하는 이미지 일괄 조회
+        ("images by product_ids", select(product_model.ProductImage).where(product_model.ProductImage.product_id.in_([1, 2, 3]))),
+        ("product_detail", queries.product_detail(1)),
+        ("product_version", queries.product_version(1)),
+        ("page_versions", queries.page_versions(queries.all_products(), 0, 16, cursor)),
+        ("page_versions by category", queries.page_versions(queries.products_by_category(1), 0, 16, cursor)),
+        ("page_versions liked by user", queries.page_versions(queries.products_liked_by(1), 0, 16, cursor)),
+        ("product_cards", queries.paginate(queries.product_cards(), 0, 16, cursor)),
+        ("product_cards by category", queries.paginate(queries.product_cards(1), 0, 16, cursor)),
+        ("search (latest)", queries.page_ids(queries.search_filter(queries.all_products(), "아이폰", latest), 0, 16, None)),
+        ("search (relevance)", queries.page_ids(
+            queries.search_filter(queries.all_products(), "아이폰", relevance), 0, 16, None,
+            rank=queries.search_rank("아이폰", relevance)
+        )),
+        ("liked product ids", select(product_model.ProductLike.product_id).where(
+            product_model.ProductLike.user_id == 1, product_model.ProductLike.product_id.in_([1, 2, 3])
+        )),
+        ("likes by product", select(product_model.ProductLike.like_id).where(product_model.ProductLike.product_id == 1)),
+        ("images by url", select(product_model.ProductImage.image_id).where(product_model.ProductImage.image_url == "x")),
+    ]
+
+def _scan_nodes(plan: dict):
+    """실행 계획 트리에서 (노드 종류, 테이블) 을 모두 꺼냄
+
+    인덱스 조건 없이 인덱스 전체를 훑으며 Filter 로 거르는 스캔은 사실상 순차 스캔이므로 "Full Index Scan" 으로 표시
+    (enable_seqscan = off 이면 플래너가 Seq Scan 대신 이런 계획을 고름)
+    """
+    node = plan["Node Type"]
+    if node in ("Index Scan", "Index Only Scan") and "Filter" in plan and "Index Cond" not in plan:
+        node = "Full Index Scan"
+    yield node, plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from _scan_nodes(child)
+
+def explain_all(verbose: bool = False) -> list[str]:
+    """모든 쿼리를 EXPLAIN 하고 순차 스캔이 있는 쿼리의 설명 목록 반환"""
+    failures = []
+    with engine.connect() as conn:
+        for name, stmt in _query_plans():
+            compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+            with conn.begin():
+                # 작은 테이블에서는 인덱스가 있어도 순차 스캔이 더 싸므로, 순차 스캔을 최후의 수단으로 만든 뒤 판단
+                conn.execute(text("SET LOCAL enable_seqscan = off"))
+                result = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params)
+                plan = result.scalar()
+            plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+            seq_scans = sorted({table for node, table in _scan_nodes(plan) if node in ("Seq Scan", "Full Index Scan")})
+            status = "FAIL" if seq_scans else "ok"
+            print(f"[{status:4}] {name}" + (f" - 순차 스캔: {', '.join(seq_scans)}" if seq_scans else ""))
+            if verbose:
+                for node, table in _scan_nodes(plan):
+                    print(f"         {node}" + (f" ({table})" if table else ""))
+            if seq_scans:
+                failures.append(f"{name}: {', '.join(seq_scans)}")
+    return failures
+
+if __name__ == "__main__":
+    failures = explain_all(verbose="--verbose" in sys.argv)
+    if failures:
+        print(f"\n인덱스를 타지 않는 쿼리 {len(failures)}개")
+        sys.exit(1)
@@ -0,0 +1,195 @@
+# 상품 이미지 파일 정리 (커밋 후 지연 삭제 + 주기적인 고아 파일 정리)
+import asyncio
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from sqlalchemy import select, union
+
+from database import engine
+from models import product_model
+import image_pipeline
+
+load_dotenv()
+
+# 삭제 대기열을 처리하는 주기 (초)
+FILE_CLEANUP_INTERVAL_SECONDS = float(os.getenv("FILE_CLEANUP_INTERVAL_SECONDS", 2))
+# 삭제 실패 시 재시도 횟수 (넘으면 고아 파일 정리에 맡김)
+FILE_CLEANUP_MAX_ATTEMPTS = int(os.getenv("FILE_CLEANUP_MAX_ATTEMPTS", 5))
+# 고아 파일 정리 주기 (초)
+FILE_SWEEP_INTERVAL_SECONDS = float(os.getenv("FILE_SWEEP_INTERVAL_SECONDS", 6 * 60 * 60))
+# 이 시간보다 최근에 쓰인 파일은 커밋 전 업로드일 수 있으므로 정리하지 않음 (초)
+FILE_SWEEP_GRACE_SECONDS = float(os.getenv("FILE_SWEEP_GRACE_SECONDS", 60 * 60))
+
+# DB 참조 여부를 한 번에 확인할 URL 수
+_REFERENCE_CHECK_BATCH = 500
+
+def _referenced_urls(image_urls) -> set[str]:
+    """product_images 또는 image_files 에서 아직 참조 중인 URL"""
+    image_urls = list(image_urls)
+    referenced = set()
+    with engine.connect() as conn:
+        for i in range(0, len(image_urls), _REFERENCE_CHECK_BATCH):
+            batch = image_urls[i:i + _REFERENCE_CHECK_BATCH]
+            stmt = union(
+                select(product_model.ProductImage.image_url).where(product_model.ProductImage.image_url.in_(batch)),
+                select(product_model.ImageFile.image_url).where(product_model.ImageFile.image_url.in_(batch)),
+            )
+            referenced.update(conn.scalars(stmt))
+    return referenced
+
+def _modified_since(image_url: str, cutoff: float) -> bool:
+    """원본 파일이 cutoff 이후에 쓰였는지 (같은 내용을 재사용한 업로드도 수정 시각을 갱신함)"""
+    path = image_pipeline.url_to_path(image_url)
+    if path is None:
+        return False
+    try:
+        return os.path.getmtime(path) >= cutoff
+    except FileNotFoundError:
+        return False
+
+def _original_name(filename: str) -> str:
+    """원본/변환본 파일 이름을 같은 이미지끼리 묶기 위한 원본 파일 이름 (.thumb.jpg, .webp 변환본 접미사 제거)"""
+    if filename.endswith(image_pipeline.THUMBNAIL_SUFFIX):
+        return filename[:-len(image_pipeline.THUMBNAIL_SUFFIX)]
+    stem, extension = os.path.splitext(filename)
+    # abcd.png.webp 는 abcd.png 의 변환본, abcd.webp 는 WebP 원본
+    if extension == ".webp" and os.path.splitext(stem)[1]:
+        return stem
+    return filename
+
+async def _run_to_completion(func):
+    """func 을 스레드에서 실행. 종료로 취소되어도 진행 중인 작업이 끝난 뒤 취소를 전달
+    (lifespan 의 마지막 process() 와 겹쳐 실행되지 않도록)"""
+    work = asyncio.ensure_future(asyncio.to_thread(func))
+    try:
+        return await asyncio.shield(work)
+    except asyncio.CancelledError:
+        await asyncio.wait([work])
+        raise
+
+class FileCleaner:
+    """참조가 끊긴 이미지 파일을 요청 밖에서 지우는 대기열
+
+    crud 는 DB 커밋이 성공한 뒤에만 enqueue 하므로 롤백된 변경의 파일은 지워지지 않음
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[str, int] = {}  # 이미지 URL -> 실패 횟수
+
+    def enqueue(self, image_urls: list[str]):
+        """삭제할 이미지 URL 등록 (파일 접근 없음)"""
+        with self._lock:
+            for image_url in image_urls:
+                self._pending.setdefault(image_url, 0)
+
+    def process(self, grace_seconds: float = FILE_SWEEP_GRACE_SECONDS) -> int:
+        """대기 중인 파일을 삭제하고 삭제한 이미지 수 반환 (실패분은 다음 주기에 재시도)
+
+        grace_seconds 안에 쓰인 파일은 다른 요청이 같은 내용을 막 업로드해 재사용 중일 수 있으므로
+        (참조 수는 그 요청이 커밋해야 생김) 지우지 않고 고아 파일 정리(sweep)에 맡김
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        try:
+            # 커밋 이후 같은 내용이 다시 업로드되어 참조가 생겼으면 지우지 않음
+            referenced = _referenced_urls(pending)
+        except Exception:
+            self._requeue(pending)
+            raise
+
+        cutoff = time.time() - grace_seconds
+        removed, failed = 0, {}
+        for image_url, attempts in pending.items():
+            if image_url in referenced or _modified_since(image_url, cutoff):
+                continue
+            try:
+                image_pipeline.remove_image_file(image_url)
+                removed += 1
+            except OSError as e:
+                if attempts + 1 < FILE_CLEANUP_MAX_ATTEMPTS:
+                    failed[image_url] = attempts + 1
+                else:
+                    print(f"이미지 파일 삭제 포기 ({image_url}): {e}")
+        self._requeue(failed)
+        return removed
+
+    def _requeue(self, items: dict[str, int]):
+        with self._lock:
+            for image_url, attempts in items.items():
+                self._pending[image_url] = max(self._pending.get(image_url, 0), attempts)
+
+    def sweep(self, grace_seconds: float = FILE_SWEEP_GRACE_SECONDS) -> int:
+        """업로드 디렉터리를 DB 와 대조해 어떤 행도 참조하지 않는 파일을 삭제하고 삭제한 파일 수 반환
+
+        원본과 변환본은 한 묶음으로 판단하며, 묶음 중 하나라도 grace_seconds 안에 쓰였으면 건너뜀
+        """
+        cutoff = time.time() - grace_seconds
+        groups: dict[tuple[str, str], list[str]] = {}
+        recent: set[tuple[str, str]] = set()
+        stale_parts = []
+
+        for dirpath, _, filenames in os.walk(image_pipeline.UPLOAD_DIR):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    modified = os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
+                if filename.endswith(".part"):
+                    # 중단된 업로드/변환의 임시 파일
+                    if modified < cutoff:
+                        stale_parts.append(path)
+                    continue
+                key = (dirpath, _original_name(filename))
+                groups.setdefault(key, []).append(path)
+                if modified >= cutoff:
+                    recent.add(key)
+
+        def to_url(path: str) -> str:
+            relative_path = os.path.relpath(path, image_pipeline.UPLOAD_DIR).replace(os.sep, "/")
+            return image_pipeline.IMAGE_URL_PREFIX + relative_path
+
+        candidates = {key: paths for key, paths in groups.items() if key not in recent}
+        referenced = _referenced_urls(to_url(path) for paths in candidates.values() for path in paths)
+
+        orphans = [
+            path
+            for paths in candidates.values() if not any(to_url(path) in referenced for path in paths)
+            for path in paths
+        ]
+
+        removed = 0
+        for path in orphans + stale_parts:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    async def run_periodic(self, interval: float = FILE_CLEANUP_INTERVAL_SECONDS):
+        """interval 마다 삭제 대기열 처리 (lifespan에서 백그라운드 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await _run_to_completion(self.process)
+            except Exception as e:
+                print(f"이미지 파일 삭제 실패: {e}")
+
+    async def run_sweeper(self, interval: float = FILE_SWEEP_INTERVAL_SECONDS):
+        """interval 마다 고아 파일 정리 (lifespan에서 백그라운드 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await _run_to_completion(self.sweep)
+                if removed:
+                    print(f"고아 이미지 파일 {removed}개 정리")
+            except Exception as e:
+                print(f"고아 이미지 파일 정리 실패: {e}")
+
+file_cleaner = FileCleaner()
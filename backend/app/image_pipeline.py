@@ -0,0 +1,317 @@
+# 상품 이미지 업로드 파이프라인 (스트리밍 저장 + 썸네일/WebP 변환)
+# 파일 이름은 내용의 SHA-256 해시 - 같은 사진은 한 번만 저장되고, 참조 수는 image_files 테이블에서 관리
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from uuid import uuid4
+from dotenv import load_dotenv
+from fastapi import UploadFile
+from sqlalchemy import func, select, update
+
+import utils
+from database import engine
+from models import product_model
+from response_cache import response_cache, PRODUCT_LIST_TAG, product_tag
+
+load_dotenv()
+
+# 이미지 저장 경로와 URL 접두사 (프론트엔드는 "../static" 을 "/static" 으로 바꿔 사용)
+UPLOAD_DIR = "../static/product_images"
+IMAGE_URL_PREFIX = "../static/product_images/"
+os.makedirs(UPLOAD_DIR, exist_ok=True) # 없으면 자동 생성
+
+# 이미지 1장 최대 크기 - 영구 저장소에 들어가는 파일 크기 제한 (요청 본문 전체는 upload_limit 가 먼저 제한)
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", 10 * 1024 * 1024))
+IMAGE_CHUNK_SIZE = 1024 * 1024                                             # 스트리밍 저장 단위
+IMAGE_UPLOAD_CONCURRENCY = int(os.getenv("IMAGE_UPLOAD_CONCURRENCY", 4))   # 동시에 저장할 파일 수
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", 2))         # 썸네일/WebP 변환 프로세스 수
+IMAGE_THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", 400))         # 썸네일 긴 변 (px)
+IMAGE_WEBP_MAX_SIZE = int(os.getenv("IMAGE_WEBP_MAX_SIZE", 1600))          # WebP 변환본 긴 변 (px)
+
+class ImageTooLarge(Exception):
+    """업로드 이미지가 IMAGE_MAX_BYTES 를 넘은 경우"""
+
+_upload_executor = ThreadPoolExecutor(max_workers=IMAGE_UPLOAD_CONCURRENCY, thread_name_prefix="image-upload")
+_variant_executor: ProcessPoolExecutor | None = None
+# 변환 완료 후 DB 기록/재시도 전용 스레드 (완료 콜백은 프로세스 풀의 관리 스레드에서 실행되므로 거기서 DB 를 기다리지 않도록)
+_record_executor: ThreadPoolExecutor | None = None
+_variant_lock = threading.Lock()
+
+def url_to_path(image_url: str) -> str | None:
+    """이미지 URL("../static/..." 또는 "/static/...")을 파일 경로로 변환"""
+    for prefix in ("../static/", "/static/"):
+        if image_url.startswith(prefix):
+            return os.path.join("..", "static", image_url[len(prefix):])
+    return None
+
+# Pillow 형식 이름 -> 저장 확장자 (같은 내용은 항상 같은 이름이 되도록 클라이언트 파일 이름 대신 사용)
+_FORMAT_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "GIF": "gif", "WEBP": "webp", "BMP": "bmp", "TIFF": "tiff"}
+# 파일 이름 확장자 정규화 (Pillow 가 읽지 못한 파일용)
+_EXTENSION_ALIASES = {"jpeg": "jpg", "jpe": "jpg", "tif": "tiff"}
+
+def _detect_extension(path: str, filename: str | None) -> str:
+    """저장된 내용으로 확장자 결정 (이미지로 읽히지 않으면 정규화한 파일 이름 확장자)"""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as image:
+            image_format = image.format
+    except (UnidentifiedImageError, OSError):
+        image_format = None
+    if image_format:
+        return _FORMAT_EXTENSIONS.get(image_format, image_format.lower())
+
+    extension = os.path.splitext(filename or "")[1].lstrip(".").lower() or "jpg"
+    return _EXTENSION_ALIASES.get(extension, extension)
+
+def _image_name(content_hash: str, extension: str) -> str:
+    """해시 기반 상대 경로 (ab/cd/abcd....ext) - 한 디렉터리에 파일이 몰리지 않도록 두 단계로 분산"""
+    return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.{extension}"
+
+def _save_one(upload_file: UploadFile) -> tuple[str, bool]:
+    """업로드 파일을 청크 단위로 해시하며 저장 (크기 제한 초과 시 ImageTooLarge)
+
+    :return: (이미지 URL, 이번에 새로 만든 파일인지 여부) - 같은 내용의 파일이 이미 있으면 재사용
+    """
+    temp_path = os.path.join(UPLOAD_DIR, f".{uuid4()}.part")
+
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(temp_path, "wb") as buffer:
+            while chunk := upload_file.file.read(IMAGE_CHUNK_SIZE):
+                written += len(chunk)
+                if written > IMAGE_MAX_BYTES:
+                    raise ImageTooLarge(upload_file.filename)
+                digest.update(chunk)
+                buffer.write(chunk)
+
+        name = _image_name(digest.hexdigest(), _detect_extension(temp_path, upload_file.filename))
+        file_path = os.path.join(UPLOAD_DIR, name)
+        if os.path.exists(file_path):
+            os.remove(temp_path)
+            # 재사용하는 파일은 수정 시각을 갱신해 고아 파일 정리(file_cleanup)의 유예 기간을 다시 적용
+            os.utime(file_path)
+            return IMAGE_URL_PREFIX + name, False
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        os.replace(temp_path, file_path)
+        return IMAGE_URL_PREFIX + name, True
+    except BaseException:
+        # 저장 도중 실패하면 일부만 쓰인 임시 파일 제거
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def save_images(upload_files: list[UploadFile]) -> list[str]:
+    """여러 이미지를 동시에 저장하고 입력 순서대로 URL 반환 (하나라도 실패하면 새로 만든 파일은 제거)"""
+    futures = [_upload_executor.submit(_save_one, upload_file) for upload_file in upload_files]
+
+    urls, created_urls, error = [], [], None
+    for future in futures:
+        try:
+            url, created = future.result()
+        except Exception as e:
+            error = error or e
+            continue
+        urls.append(url)
+        if created:
+            created_urls.append(url)
+    if error:
+        delete_image_files(created_urls)
+        raise error
+    return urls
+
+def remove_image_file(image_url: str):
+    """원본과 썸네일/WebP 변환본 파일 삭제 (없는 파일은 무시, 그 외 OSError 는 그대로 발생)"""
+    for url in dict.fromkeys((image_url, *variant_urls(image_url))):
+        path = url_to_path(url)
+        if path is None:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def delete_image_files(image_urls: list[str]):
+    """이미지 파일들을 즉시 삭제 (DB 에 기록되지 않은 업로드 실패분 정리용)"""
+    for image_url in image_urls:
+        try:
+            remove_image_file(image_url)
+        except OSError as e:
+            print(f"이미지 파일 삭제 실패 ({image_url}): {e}")
+
+# ----- 썸네일 / WebP 변환 -----
+THUMBNAIL_SUFFIX = ".thumb.jpg"
+
+def variant_urls(image_url: str) -> tuple[str, str]:
+    """원본 URL 에 대응하는 (썸네일 URL, WebP URL) - 원본이 WebP 이면 원본을 그대로 WebP 로 사용
+
+    확장자까지 포함한 원본 이름 뒤에 붙여 (abcd.png -> abcd.png.thumb.jpg, abcd.png.webp)
+    서로 다른 원본이 변환본을 공유하지 않도록 함
+    """
+    if image_url.endswith(".webp"):
+        return f"{image_url}{THUMBNAIL_SUFFIX}", image_url
+    return f"{image_url}{THUMBNAIL_SUFFIX}", f"{image_url}.webp"
+
+def _make_variants(file_path: str, thumbnail_path: str, webp_path: str):
+    """썸네일(JPEG)과 WebP 변환본 생성 (변환 프로세스에서 실행)"""
+    from PIL import Image, ImageOps
+
+    with Image.open(file_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        # 임시 이름으로 쓴 뒤 교체 (다른 요청이 반쯤 쓰인 변환본을 재사용하지 않도록)
+        if webp_path != file_path:
+            webp = image.copy()
+            webp.thumbnail((IMAGE_WEBP_MAX_SIZE, IMAGE_WEBP_MAX_SIZE))
+            _save_atomic(webp, webp_path, "WEBP", quality=80, method=4)
+
+        thumbnail = image.convert("RGB")
+        thumbnail.thumbnail((IMAGE_THUMBNAIL_SIZE, IMAGE_THUMBNAIL_SIZE))
+        _save_atomic(thumbnail, thumbnail_path, "JPEG", quality=80, optimize=True, progressive=True)
+
+def _save_atomic(image, path: str, image_format: str, **options):
+    temp_path = f"{path}.{uuid4().hex}.part"
+    try:
+        image.save(temp_path, image_format, **options)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _get_variant_executor() -> ProcessPoolExecutor:
+    global _variant_executor
+    with _variant_lock:
+        if _variant_executor is None:
+            _variant_executor = utils.new_process_pool(IMAGE_VARIANT_WORKERS)
+        return _variant_executor
+
+def start_variant_executor():
+    """변환 프로세스 풀 생성 (애플리케이션 시작 시, 첫 업로드 요청 중에 만들지 않도록)"""
+    _get_variant_executor()
+
+def _get_record_executor() -> ThreadPoolExecutor:
+    global _record_executor
+    with _variant_lock:
+        if _record_executor is None:
+            _record_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-variant-record")
+        return _record_executor
+
+def _discard_variant_executor(broken: ProcessPoolExecutor):
+    """변환 프로세스가 비정상 종료되어 못 쓰게 된 풀을 버림 (다음 _get_variant_executor 가 새로 만듦)"""
+    global _variant_executor
+    with _variant_lock:
+        if _variant_executor is broken:
+            _variant_executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def _record_variants(image_url: str, thumbnail_url: str, webp_url: str):
+    """해당 원본을 쓰는 ProductImage 행(과 대표 이미지로 쓰는 상품)에 변환본 URL 기록"""
+    try:
+        with engine.begin() as conn:
+            product_ids = conn.scalars(
+                update(product_model.ProductImage)
+                .where(product_model.ProductImage.image_url == image_url)
+                .values(thumbnail_url=thumbnail_url, webp_url=webp_url)
+                .returning(product_model.ProductImage.product_id)
+            ).all()
+            conn.execute(
+                update(product_model.Product)
+                .where(product_model.Product.product_id.in_(
+                    select(product_model.ProductImage.product_id).where(
+                        product_model.ProductImage.image_url == image_url,
+                        product_model.ProductImage.is_representative.is_(True)
+                    )
+                ))
+                .values(representative_thumbnail_url=thumbnail_url)
+            )
+            # 상품 응답에 변환본 URL 이 새로 포함되므로 응답 버전(ETag)도 갱신
+            if product_ids:
+                conn.execute(
+                    update(product_model.Product)
+                    .where(product_model.Product.product_id.in_(set(product_ids)))
+                    .values(updated_at=func.now())
+                )
+        # 캐시된 상품 응답에 변환본 URL 이 빠져 있으므로 무효화
+        if product_ids:
+            response_cache.invalidate(PRODUCT_LIST_TAG, *(product_tag(product_id) for product_id in set(product_ids)))
+    except Exception as e:
+        print(f"이미지 변환본 기록 실패 ({image_url}): {e}")
+
+def _submit_variants(image_url: str, thumbnail_url: str, webp_url: str, retry: bool = True):
+    """변환 작업을 프로세스 풀에 맡김 (풀이 망가져 있으면 새로 만들어 한 번만 재시도)"""
+    executor = _get_variant_executor()
+    try:
+        future = executor.submit(_make_variants, url_to_path(image_url), url_to_path(thumbnail_url), url_to_path(webp_url))
+    except BrokenProcessPool:
+        _discard_variant_executor(executor)
+        if not retry:
+            raise
+        _submit_variants(image_url, thumbnail_url, webp_url, retry=False)
+        return
+    future.add_done_callback(
+        lambda f: _hand_off(_on_variants_done, image_url, thumbnail_url, webp_url, f, executor, retry)
+    )
+
+def _hand_off(fn, image_url: str, *args):
+    """완료 콜백에서 호출 - 실제 처리는 기록 전용 스레드에 넘기고 바로 반환"""
+    try:
+        _get_record_executor().submit(fn, image_url, *args)
+    except RuntimeError as e:
+        # 종료 중이라 더 받을 수 없는 경우
+        print(f"이미지 변환본 기록 생략 ({image_url}): {e}")
+
+def _on_variants_done(image_url: str, thumbnail_url: str, webp_url: str, future, executor, retry: bool):
+    """변환 결과 처리 (기록 전용 스레드에서 실행)"""
+    if retry and not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+        # 변환 프로세스가 죽으면(OOM 등) 풀을 새로 만들어 한 번만 다시 맡김 (변환본은 임시 파일로 쓰므로 재실행해도 안전)
+        _discard_variant_executor(executor)
+        try:
+            _submit_variants(image_url, thumbnail_url, webp_url, retry=False)
+        except Exception as e:
+            print(f"이미지 변환 재시도 실패 ({image_url}): {e}")
+        return
+    if future.cancelled() or future.exception() is not None:
+        print(f"이미지 변환 실패 ({image_url}): {future.exception() if not future.cancelled() else 'cancelled'}")
+        return
+    _record_variants(image_url, thumbnail_url, webp_url)
+
+def schedule_variants(image_urls: list[str]):
+    """저장된 원본들의 썸네일/WebP 변환을 백그라운드 프로세스에 맡김 (DB 커밋 후 호출)
+
+    같은 내용의 이미지가 이미 변환되어 있으면 변환 없이 URL 만 기록
+    """
+    for image_url in dict.fromkeys(image_urls):
+        file_path = url_to_path(image_url)
+        if file_path is None:
+            continue
+        thumbnail_url, webp_url = variant_urls(image_url)
+        thumbnail_path, webp_path = url_to_path(thumbnail_url), url_to_path(webp_url)
+        if os.path.exists(thumbnail_path) and os.path.exists(webp_path):
+            _record_variants(image_url, thumbnail_url, webp_url)
+            continue
+        _submit_variants(image_url, thumbnail_url, webp_url)
+
+def shutdown_variant_executor():
+    """변환 프로세스 풀 종료 (애플리케이션 종료 시, 진행 중인 변환과 그 결과 기록은 마무리)"""
+    global _variant_executor, _record_executor
+    with _variant_lock:
+        variant_executor, _variant_executor = _variant_executor, None
+    if variant_executor is not None:
+        variant_executor.shutdown(wait=True)
+
+    with _variant_lock:
+        record_executor, _record_executor = _record_executor, None
+    if record_executor is not None:
+        record_executor.shutdown(wait=True)
+
+    # 기록 스레드의 재시도가 새로 만든 풀이 있으면 함께 종료
+    with _variant_lock:
+        variant_executor, _variant_executor = _variant_executor, None
+    if variant_executor is not None:
+        variant_executor.shutdown(wait=True)
@@ -0,0 +1,229 @@
+# 요청 계측 - 라우트별 응답 시간, 요청당 쿼리 수/DB 시간, N+1 의심 요청, 느린 쿼리 로그
+import os
+import sys
+import time
+from collections import Counter as StatementCounter
+from contextvars import ContextVar
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import MetricFamily, Counter, Histogram, render_histogram
+from pool_metrics import pool_status
+
+load_dotenv()
+
+# 한 요청에서 이 수보다 많은 쿼리를 실행하면 N+1 의심으로 기록
+INSTRUMENTATION_QUERY_THRESHOLD = int(os.getenv("INSTRUMENTATION_QUERY_THRESHOLD", 15))
+# 이 시간(초) 이상 걸린 쿼리는 바인딩 파라미터와 함께 로그
+INSTRUMENTATION_SLOW_QUERY_SECONDS = float(os.getenv("INSTRUMENTATION_SLOW_QUERY_SECONDS", 0.5))
+
+# 로그에 남길 SQL / 파라미터 최대 길이
+_LOG_MAX_CHARS = 1000
+# 느린 쿼리 로그에서 값을 가릴 바인딩 파라미터 (이름에 포함되면 가림, 예: hashed_password, email_1)
+_SENSITIVE_PARAMS = ("password", "email", "phone", "token")
+_REDACTED = "***"
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+QUERY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+request_duration = MetricFamily(
+    "http_request_duration_seconds", "라우트별 응답 시간", ("method", "route"), REQUEST_BUCKETS
+)
+requests_total = MetricFamily("http_requests_total", "라우트/상태 코드별 요청 수", ("method", "route", "status"))
+request_queries = MetricFamily(
+    "db_queries_per_request", "요청당 실행한 쿼리 수", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+request_db_time = MetricFamily(
+    "db_time_per_request_seconds", "요청당 DB 쿼리 실행 시간 합계", ("method", "route"), REQUEST_BUCKETS
+)
+n_plus_one_total = MetricFamily(
+    "db_n_plus_one_requests_total", f"쿼리를 {INSTRUMENTATION_QUERY_THRESHOLD}개보다 많이 실행한 요청 수", ("method", "route")
+)
+query_duration = Histogram(QUERY_BUCKETS)
+slow_queries_total = Counter()
+
+class RequestStats:
+    """한 요청 동안의 쿼리 수, DB 시간, 문장별 실행 횟수"""
+
+    __slots__ = ("route", "queries", "db_time", "statements")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = StatementCounter()
+
+# 현재 요청의 통계 (스레드풀의 동기 라우트, async 엔진의 greenlet 에도 컨텍스트가 전달됨)
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+def _truncate(value) -> str:
+    """로그 한 줄에 맞게 공백을 줄이고 길이 제한"""
+    text = " ".join(value.split()) if isinstance(value, str) else repr(value)
+    return text if len(text) <= _LOG_MAX_CHARS else text[:_LOG_MAX_CHARS] + "..."
+
+def _redact_params(params: dict) -> dict:
+    return {
+        key: _REDACTED if any(name in key.lower() for name in _SENSITIVE_PARAMS) else value
+        for key, value in params.items()
+    }
+
+def _redact_strings(value):
+    if isinstance(value, str):
+        return _REDACTED
+    if isinstance(value, dict):
+        return {key: _redact_strings(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_redact_strings(item) for item in value)
+    return value
+
+def _loggable_parameters(parameters, context):
+    """로그에 남길 바인딩 파라미터 (이메일, 비밀번호 해시 등 민감한 값은 가림)
+
+    - 컴파일된 문장은 파라미터 이름으로 판단 (asyncpg 처럼 위치 기반이어도 이름을 알 수 있음)
+    - 이름을 알 수 없는 경우(exec_driver_sql 등)는 문자열 값을 모두 가림
+    """
+    compiled_parameters = getattr(context, "compiled_parameters", None)
+    if getattr(context, "compiled", None) is not None and compiled_parameters:
+        redacted = [_redact_params(params) for params in compiled_parameters]
+        return redacted if context.executemany else redacted[0]
+    return _redact_strings(parameters)
+
+def _caller() -> str | None:
+    """쿼리를 실행한 앱 코드 위치 (crud 함수 등, sqlalchemy 내부 프레임은 건너뜀)
+
+    async 엔진은 greenlet 안에서 실행되어 호출한 코루틴 프레임이 보이지 않으므로 None
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(("sqlalchemy", "greenlet", __name__)):
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    query_duration.observe(elapsed)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        stats.statements[statement] += 1
+
+    if elapsed >= INSTRUMENTATION_SLOW_QUERY_SECONDS:
+        slow_queries_total.inc()
+        where = stats.route if stats is not None else "백그라운드"
+        caller = _caller()
+        print(
+            f"느린 쿼리 ({elapsed * 1000:.0f}ms, {where}" + (f", {caller}" if caller else "") + f"): "
+            f"{_truncate(statement)} / 파라미터: {_truncate(_loggable_parameters(parameters, context))}"
+        )
+
+def _handle_error(exception_context):
+    # 실패한 쿼리는 after_cursor_execute 가 호출되지 않으므로 시작 시각만 정리
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+def instrument_engine(engine: Engine):
+    """엔진(비동기 엔진은 .sync_engine)에 쿼리 계측 이벤트 등록"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+def _route_label(scope: Scope) -> str:
+    """라우트 경로 템플릿 (/products/{product_id}) - 실제 경로를 쓰면 라벨 수가 무한히 늘어남"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("endpoint") is not None:
+        # Mount(/static 등)는 마운트 경로로 묶음
+        return scope.get("root_path") or "/"
+    return "unmatched"
+
+class InstrumentationMiddleware:
+    """요청마다 응답 시간, 쿼리 수, DB 시간을 라우트별로 기록하고 N+1 의심 요청을 로그"""
+
+    def __init__(self, app: ASGIApp, query_threshold: int = INSTRUMENTATION_QUERY_THRESHOLD):
+        self.app = app
+        self.query_threshold = query_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["path"])
+        token = _request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            self._record(scope, stats, status_code, elapsed)
+
+    def _record(self, scope: Scope, stats: RequestStats, status_code: int, elapsed: float):
+        method, route = scope["method"], _route_label(scope)
+        request_duration.labels(method, route).observe(elapsed)
+        requests_total.labels(method, route, status_code).inc()
+        request_queries.labels(method, route).observe(stats.queries)
+        request_db_time.labels(method, route).observe(stats.db_time)
+
+        if stats.queries > self.query_threshold:
+            n_plus_one_total.labels(method, route).inc()
+            statement, repeated = stats.statements.most_common(1)[0]
+            print(
+                f"N+1 의심 ({method} {route}): 쿼리 {stats.queries}개, DB {stats.db_time * 1000:.0f}ms, "
+                f"가장 많이 반복된 쿼리 {repeated}회: {_truncate(statement)}"
+            )
+
+def _pool_metrics(engines: dict) -> list[str]:
+    """엔진별 커넥션 풀 게이지와 체크아웃 대기 시간"""
+    gauges = {
+        "size": "db_pool_size",
+        "checked_in": "db_pool_checked_in",
+        "checked_out": "db_pool_checked_out",
+        "overflow": "db_pool_overflow",
+    }
+    statuses = {name: pool_status(engine.pool) for name, engine in engines.items()}
+
+    lines = []
+    for key, metric in gauges.items():
+        lines += [f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{engine="{name}"}} {status[key]}' for name, status in statuses.items()]
+    lines.append("# TYPE db_pool_checkout_wait_seconds histogram")
+    for name, status in statuses.items():
+        if "checkout_wait_seconds" in status:
+            lines += render_histogram("db_pool_checkout_wait_seconds", status["checkout_wait_seconds"], {"engine": name})
+    return lines
+
+def render_metrics(engines: dict) -> str:
+    """Prometheus 텍스트 형식의 전체 지표 (engines: {"sync": engine, "async": async_engine.sync_engine})"""
+    lines = []
+    for family in (request_duration, requests_total, request_queries, request_db_time, n_plus_one_total):
+        lines += family.render()
+    lines += ["# HELP db_query_duration_seconds 쿼리 실행 시간", "# TYPE db_query_duration_seconds histogram"]
+    lines += render_histogram("db_query_duration_seconds", query_duration.snapshot())
+    lines += [
+        f"# HELP db_slow_queries_total {INSTRUMENTATION_SLOW_QUERY_SECONDS}초 이상 걸린 쿼리 수",
+        "# TYPE db_slow_queries_total counter",
+        f"db_slow_queries_total {slow_queries_total.value}",
+    ]
+    lines += _pool_metrics(engines)
+    return "\n".join(lines) + "\n"
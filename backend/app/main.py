@@ -1,22 +1,67 @@
+import asyncio
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 
-from routers import users, categories, products
-from database import init_db
+from routers import users, categories, products, internal
+from database import init_db, engine, async_engine
+from view_counter import view_counter
+from file_cleanup import file_cleaner
+import utils
+import image_pipeline
+from static_files import ImageStaticFiles
+from compression import CompressionMiddleware
+from upload_limit import UploadSizeLimitMiddleware
+from instrumentation import InstrumentationMiddleware, instrument_engine
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("애플리케이션 시작")
-    init_db()
-    yield
-    print("애플리케이션 종료")
+    tasks = []
+    try:
+        init_db()
+        utils.start_password_executor()
+        image_pipeline.start_variant_executor()
+        tasks.append(asyncio.create_task(view_counter.run_periodic()))
+        tasks.append(asyncio.create_task(file_cleaner.run_periodic()))
+        tasks.append(asyncio.create_task(file_cleaner.run_sweeper()))
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        # 진행 중인 주기 작업이 끝난 뒤 마지막 정리를 실행 (같은 작업이 겹치지 않도록)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # 종료 전 남은 조회수 반영, 대기 중인 파일 삭제, 프로세스 풀 종료 (한 단계가 실패해도 나머지는 실행)
+        for name, step in (
+            ("조회수 반영", view_counter.flush),
+            ("이미지 파일 삭제", file_cleaner.process),
+            ("비밀번호 해싱 풀 종료", utils.shutdown_password_executor),
+            ("이미지 변환 풀 종료", image_pipeline.shutdown_variant_executor),
+        ):
+            try:
+                step()
+            except Exception as e:
+                print(f"종료 처리 실패 ({name}): {e}")
+        print("애플리케이션 종료")
 
-app = FastAPI(lifespan=lifespan)
+# 응답 모델을 반환하는 라우트의 JSON 인코딩은 orjson 사용 (목록/피드 라우트는 serializers 의 빠른 경로 사용)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
-app.mount("/static", StaticFiles(directory="../static"), name="static")
+@app.exception_handler(utils.PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: utils.PasswordHasherBusy):
+    # 비밀번호 해싱 대기열이 가득 찬 경우 (로그인/회원가입 폭주)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요."},
+        headers={"Retry-After": "1"},
+    )
+
+app.mount("/static", ImageStaticFiles(directory="../static"), name="static")
+
+# 너무 큰 업로드는 본문을 받기 전에 거절 (CORS 안쪽에 두어 413 응답에도 CORS 헤더가 붙도록 함)
+app.add_middleware(UploadSizeLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,11 +69,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# JSON 응답 압축 (정적 이미지는 이미 압축된 형식이므로 제외)
+app.add_middleware(CompressionMiddleware, excluded_paths=("/static/",))
+# 라우트별 응답 시간/쿼리 수 계측 (압축까지 포함해 측정하도록 가장 바깥에 둠)
+app.add_middleware(InstrumentationMiddleware)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 app.include_router(users.router, prefix="/users", tags=["users"])
 app.include_router(categories.router, prefix="/categories", tags=["categories"])
 app.include_router(products.router, prefix="/products", tags=["products"])
+app.include_router(internal.router, prefix="/internal", tags=["internal"])
+app.include_router(internal.metrics_router, tags=["internal"])
 
 if __name__ == "__main__":
     uvicorn.run("main:app",
@@ -0,0 +1,111 @@
+# 내부 지표 (히스토그램, 카운터, Prometheus 텍스트 형식 출력)
+import bisect
+import threading
+
+# 기본 버킷 경계 (초)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class Histogram:
+    """고정 버킷 히스토그램 (Prometheus 와 같은 누적 버킷 형태로 조회)"""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1) # 마지막 칸은 +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """{"buckets": {경계: 누적 개수}, "sum": 합계, "count": 개수}"""
+        with self._lock:
+            counts = list(self._counts)
+            total_sum, total_count = self._sum, self._count
+
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {"buckets": cumulative, "sum": total_sum, "count": total_count}
+
+class Counter:
+    """단조 증가 카운터"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return self._value
+
+class MetricFamily:
+    """라벨 값 조합별 지표 묶음 (Prometheus 의 metric family)
+
+    labels(...) 로 해당 조합의 Histogram / Counter 를 얻어 기록하고, render() 로 텍스트 형식 출력
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...], buckets: tuple | None = None):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets # None 이면 카운터
+        self._children: dict[tuple, Histogram | Counter] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Histogram | Counter:
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = Histogram(self.buckets) if self.buckets is not None else Counter()
+                    self._children[values] = child
+        return child
+
+    def render(self) -> list[str]:
+        kind = "histogram" if self.buckets is not None else "counter"
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            labels = dict(zip(self.label_names, values))
+            if isinstance(child, Histogram):
+                lines.extend(render_histogram(self.name, child.snapshot(), labels))
+            else:
+                lines.append(f"{self.name}{format_labels(labels)} {child.value}")
+        return lines
+
+def format_labels(labels: dict) -> str:
+    """{"a": "b"} -> '{a="b"}' (값의 \\, ", 줄바꿈은 이스케이프)"""
+    if not labels:
+        return ""
+    escaped = (
+        f'{name}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+def render_histogram(name: str, snapshot: dict, labels: dict | None = None) -> list[str]:
+    """Histogram.snapshot() 을 Prometheus 텍스트 형식 줄로 변환"""
+    labels = labels or {}
+    lines = [
+        f"{name}_bucket{format_labels({**labels, 'le': bound})} {count}"
+        for bound, count in snapshot["buckets"].items()
+    ]
+    lines.append(f"{name}_sum{format_labels(labels)} {snapshot['sum']}")
+    lines.append(f"{name}_count{format_labels(labels)} {snapshot['count']}")
+    return lines
@@ -0,0 +1,35 @@
+# alembic 실행 환경 - 앱과 같은 engine/metadata 사용
+from logging.config import fileConfig
+
+from alembic import context
+
+from database import Base, engine
+from models import user_model, category_model, product_model  # noqa: F401 (metadata 등록)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    """SQL 스크립트만 출력 (alembic upgrade head --sql)"""
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
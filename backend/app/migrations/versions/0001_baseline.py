@@ -0,0 +1,86 @@
+"""baseline - create_all 로 만들던 최초 스키마
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+product_tag_enum = sa.Enum("NONE", "FREE", "NEW", "USED", "URGENT", name="producttagenum")
+product_status_enum = sa.Enum("FOR_SALE", "RESERVED", "SOLD_OUT", name="productstatusenum")
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("nickname", sa.String(10), nullable=False, unique=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_users_user_id", "users", ["user_id"])
+
+    op.create_table(
+        "categories",
+        sa.Column("category_id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(30), nullable=False),
+        sa.Column("icon_name", sa.String(50), nullable=True),
+    )
+    op.create_index("ix_categories_category_id", "categories", ["category_id"])
+    op.create_index("ix_categories_name", "categories", ["name"], unique=True)
+
+    op.create_table(
+        "products",
+        sa.Column("product_id", sa.Integer(), primary_key=True),
+        sa.Column("seller_id", sa.Integer(), sa.ForeignKey("users.user_id"), nullable=False),
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.category_id"), nullable=False),
+        sa.Column("title", sa.String(50), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("price", sa.Integer(), nullable=False),
+        sa.Column("trade_city", sa.String(10), nullable=True),
+        sa.Column("trade_district", sa.String(10), nullable=True),
+        sa.Column("product_tag", product_tag_enum, nullable=False),
+        sa.Column("product_status", product_status_enum, nullable=False),
+        sa.Column("views", sa.Integer(), nullable=True),
+        sa.Column("likes", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_products_product_id", "products", ["product_id"])
+
+    op.create_table(
+        "product_images",
+        sa.Column("image_id", sa.Integer(), primary_key=True),
+        sa.Column("image_url", sa.String(1024), nullable=False),
+        sa.Column("is_representative", sa.Boolean(), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.product_id"), nullable=False),
+    )
+    op.create_index("ix_product_images_image_id", "product_images", ["image_id"])
+
+    op.create_table(
+        "product_likes",
+        sa.Column("like_id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id"), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.product_id"), nullable=False),
+        sa.UniqueConstraint("user_id", "product_id", name="_user_product_uc"),
+    )
+    op.create_index("ix_product_likes_like_id", "product_likes", ["like_id"])
+
+
+def downgrade():
+    op.drop_table("product_likes")
+    op.drop_table("product_images")
+    op.drop_table("products")
+    op.drop_table("categories")
+    op.drop_table("users")
+    product_status_enum.drop(op.get_bind(), checkfirst=True)
+    product_tag_enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,25 @@
+"""상품 이미지 썸네일/WebP 변환본 URL 컬럼
+
+create_all 로 이미 만들어진 DB 에서도 돌 수 있도록 if_not_exists 로 생성
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("product_images", sa.Column("thumbnail_url", sa.String(1024), nullable=True), if_not_exists=True)
+    op.add_column("product_images", sa.Column("webp_url", sa.String(1024), nullable=True), if_not_exists=True)
+
+
+def downgrade():
+    op.drop_column("product_images", "webp_url")
+    op.drop_column("product_images", "thumbnail_url")
@@ -0,0 +1,36 @@
+"""내용 해시 이름 이미지 파일의 참조 수 테이블 (image_files)
+
+create_all 로 이미 만들어진 DB 에서도 돌 수 있도록 if_not_exists 로 생성
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "image_files",
+        sa.Column("image_url", sa.String(1024), primary_key=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        if_not_exists=True,
+    )
+
+    # 기존 상품 이미지의 참조 수 채우기
+    op.execute("""
+        INSERT INTO image_files (image_url, ref_count)
+        SELECT image_url, count(*) FROM product_images GROUP BY image_url
+        ON CONFLICT (image_url) DO NOTHING
+    """)
+
+
+def downgrade():
+    op.drop_table("image_files", if_exists=True)
@@ -0,0 +1,36 @@
+"""상품의 대표 이미지/썸네일 URL 컬럼 (목록 조회 시 product_images 조인 제거)
+
+create_all 로 이미 만들어진 DB 에서도 돌 수 있도록 if_not_exists 로 생성
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("products", sa.Column("representative_image_url", sa.String(1024), nullable=True), if_not_exists=True)
+    op.add_column("products", sa.Column("representative_thumbnail_url", sa.String(1024), nullable=True), if_not_exists=True)
+
+    # 기존 상품의 대표 이미지 채우기
+    op.execute("""
+        UPDATE products AS p
+        SET representative_image_url = i.image_url,
+            representative_thumbnail_url = i.thumbnail_url
+        FROM product_images AS i
+        WHERE i.product_id = p.product_id
+          AND i.is_representative
+          AND p.representative_image_url IS NULL
+    """)
+
+
+def downgrade():
+    op.drop_column("products", "representative_thumbnail_url")
+    op.drop_column("products", "representative_image_url")
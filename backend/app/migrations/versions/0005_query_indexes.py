@@ -0,0 +1,72 @@
+"""조회 조건에 맞춘 인덱스
+
+create_all 로 일부가 이미 만들어진 DB 에서도 돌 수 있도록 모두 if_not_exists 로 생성
+인덱스는 운영 중인 테이블의 쓰기를 막지 않도록 CREATE INDEX CONCURRENTLY 로 생성
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 검색용 trigram 인덱스(gin_trgm_ops)에 필요한 확장
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # ----- 인덱스 (queries 모듈의 조회 조건/정렬과 같은 순서) -----
+    # CONCURRENTLY 는 트랜잭션 안에서 실행할 수 없으므로 autocommit 으로 생성
+    # (일반 CREATE INDEX 는 생성이 끝날 때까지 테이블 쓰기를 막음)
+    # 생성 도중 실패하면 INVALID 인덱스가 남아 if_not_exists 에 걸리므로 해당 인덱스를 DROP 한 뒤 다시 실행
+    with op.get_context().autocommit_block():
+        # 최신순 목록 keyset 페이지네이션: ORDER BY created_at DESC, product_id DESC
+        op.create_index(
+            "ix_products_created_at_product_id", "products",
+            [sa.text("created_at DESC"), sa.text("product_id DESC")],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # 카테고리별 / 판매자별 목록: WHERE category_id|seller_id = ? ORDER BY created_at DESC, product_id DESC
+        op.create_index(
+            "ix_products_category_created_at", "products",
+            ["category_id", sa.text("created_at DESC"), sa.text("product_id DESC")],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            "ix_products_seller_created_at", "products",
+            ["seller_id", sa.text("created_at DESC"), sa.text("product_id DESC")],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # 검색: title/content ILIKE '%검색어%', similarity
+        op.create_index(
+            "ix_products_title_trgm", "products", ["title"],
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            "ix_products_content_trgm", "products", ["content"],
+            postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # 상품 이미지 일괄 로딩(product_id IN ...), 변환본 기록/파일 정리(image_url = ?)
+        op.create_index("ix_product_images_product_id", "product_images", ["product_id"], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index("ix_product_images_image_url", "product_images", ["image_url"], postgresql_concurrently=True, if_not_exists=True)
+        # 상품 삭제 시 찜 삭제(product_id = ?) - user_id 조건은 _user_product_uc 가 처리
+        op.create_index("ix_product_likes_product_id", "product_likes", ["product_id"], postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_product_likes_product_id", table_name="product_likes", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_product_images_image_url", table_name="product_images", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_product_images_product_id", table_name="product_images", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_products_content_trgm", table_name="products", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_products_title_trgm", table_name="products", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_products_seller_created_at", table_name="products", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_products_category_created_at", table_name="products", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_products_created_at_product_id", table_name="products", postgresql_concurrently=True, if_exists=True)
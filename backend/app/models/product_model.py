@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, String, Boolean, Text, DateTime,
-    ForeignKey, func, Enum as SQLEnum, UniqueConstraint
+    ForeignKey, func, Enum as SQLEnum, UniqueConstraint, Index
 )
 
 from sqlalchemy.orm import relationship
@@ -39,6 +39,10 @@ class Product(Base):
     views = Column(Integer, default=0)
     likes = Column(Integer, default=0)
 
+    # 대표 이미지 URL 비정규화 (카드/목록에서 이미지 테이블을 읽지 않도록 crud 가 이미지 변경 시 함께 갱신)
+    representative_image_url = Column(String(1024), nullable=True)
+    representative_thumbnail_url = Column(String(1024), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -46,23 +50,46 @@ class Product(Base):
     category = relationship("Category")
     images = relationship("ProductImage", back_populates="product", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # 최신순 keyset 페이지네이션 (created_at, product_id) 범위 스캔용 복합 인덱스
+        Index("ix_products_created_at_product_id", created_at.desc(), product_id.desc()),
+        Index("ix_products_category_created_at", category_id, created_at.desc(), product_id.desc()),
+        Index("ix_products_seller_created_at", seller_id, created_at.desc(), product_id.desc()),
+        # 검색 (ILIKE '%검색어%', similarity) 용 pg_trgm GIN 인덱스
+        Index("ix_products_title_trgm", title, postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_products_content_trgm", content, postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}),
+    )
+    # INSERT/UPDATE 시 created_at, updated_at 등 서버 기본값을 RETURNING 으로 함께 받아옴 (commit 후 refresh 불필요)
+    __mapper_args__ = {"eager_defaults": True}
+
 class ProductImage(Base):
     __tablename__ = "product_images"
 
     image_id = Column(Integer, primary_key=True, index=True)
-    image_url = Column(String(1024), nullable=False)
+    image_url = Column(String(1024), nullable=False, index=True)
     is_representative = Column(Boolean, default=False, nullable=False)
+    # 백그라운드 변환이 끝나면 채워지는 변환본 URL
+    thumbnail_url = Column(String(1024), nullable=True)
+    webp_url = Column(String(1024), nullable=True)
 
-    product_id = Column(Integer, ForeignKey("products.product_id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.product_id"), nullable=False, index=True)
 
     product = relationship("Product", back_populates="images")
 
+class ImageFile(Base):
+    """내용 해시로 저장된 이미지 파일과 이를 참조하는 ProductImage 수 (0 이 되면 파일 삭제)"""
+    __tablename__ = "image_files"
+
+    image_url = Column(String(1024), primary_key=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class ProductLike(Base):
     __tablename__ = "product_likes"
 
     like_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.product_id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.product_id"), nullable=False, index=True)
 
     user = relationship("User")
     product = relationship("Product")
@@ -0,0 +1,40 @@
+# 커서(keyset) 기반 페이지네이션
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException, Query
+
+# 다음 페이지 커서를 담는 응답 헤더 (목록 응답 본문 형식은 그대로 유지)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, product_id: int) -> str:
+    """(created_at, product_id)를 불투명한 커서 문자열로 인코딩"""
+    raw = json.dumps([created_at.isoformat(), product_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """커서 문자열을 (created_at, product_id)로 디코딩 (잘못된 커서는 ValueError)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, product_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(product_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("유효하지 않은 커서입니다.") from e
+
+async def get_cursor(
+    cursor: str | None = Query(default=None, description="이전 응답의 X-Next-Cursor 값 (없으면 skip 사용)")
+) -> tuple[datetime, int] | None:
+    """요청의 cursor 쿼리 파라미터를 디코딩하는 의존성"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def next_cursor_headers(items: list, limit: int) -> dict[str, str]:
+    """페이지가 가득 찼으면 마지막 항목 기준의 다음 커서 헤더 반환 (아니면 빈 dict)"""
+    if items and len(items) >= limit:
+        last = items[-1]
+        return {NEXT_CURSOR_HEADER: encode_cursor(last.created_at, last.product_id)}
+    return {}
@@ -0,0 +1,42 @@
+# 커넥션 풀 지표 (체크아웃 대기 시간, 사용 현황)
+import time
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from metrics import Histogram
+
+# 체크아웃 대기 시간 버킷 (초) - pool_timeout 근처까지 확인할 수 있도록 구성
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+
+class _TimedPoolMixin:
+    """커넥션을 꺼낼 때까지 기다린 시간을 checkout_wait 히스토그램에 기록"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = Histogram(POOL_WAIT_BUCKETS)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.checkout_wait.observe(time.perf_counter() - start)
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_status(pool) -> dict:
+    """풀 게이지와 체크아웃 대기 시간 히스토그램"""
+    status = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0), # 풀 크기 미만일 때는 음수이므로 0으로 표시
+        "timeout": pool.timeout(),
+    }
+    checkout_wait = getattr(pool, "checkout_wait", None)
+    if checkout_wait is not None:
+        status["checkout_wait_seconds"] = checkout_wait.snapshot()
+    return status
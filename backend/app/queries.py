@@ -0,0 +1,170 @@
+# 조회 쿼리(select 문) 빌더 - 동기 crud 와 비동기 crud_async 가 함께 사용
+from datetime import datetime
+from sqlalchemy import or_, func, select, tuple_
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Optional, Tuple
+
+from schemas import product_schema
+from models import user_model, category_model, product_model
+
+# keyset 페이지네이션 커서 (created_at, product_id)
+Cursor = Optional[Tuple[datetime, int]]
+
+# ----- 카테고리 -----
+def category_by_id(category_id: int):
+    return select(category_model.Category).where(category_model.Category.category_id == category_id)
+
+def category_by_name(name: str):
+    return select(category_model.Category).where(category_model.Category.name == name)
+
+def all_categories():
+    return select(category_model.Category).order_by(category_model.Category.category_id)
+
+# ----- 상품 목록 -----
+def paginate(stmt, skip: int, limit: int, cursor: Cursor, rank=None):
+    """최신순 정렬 후 페이지 적용 (cursor가 있으면 keyset, 없으면 offset)
+
+    rank 식이 주어지면 관련도순으로 정렬하며, 이때는 keyset을 쓸 수 없어 항상 offset을 사용
+    """
+    if rank is not None:
+        return stmt.order_by(
+            rank.desc(),
+            product_model.Product.created_at.desc(),
+            product_model.Product.product_id.desc()
+        ).offset(skip).limit(limit)
+
+    stmt = stmt.order_by(
+        product_model.Product.created_at.desc(),
+        product_model.Product.product_id.desc()
+    )
+    if cursor:
+        # (created_at, product_id) 복합 인덱스를 타는 범위 조건
+        stmt = stmt.where(
+            tuple_(product_model.Product.created_at, product_model.Product.product_id) < tuple_(*cursor)
+        )
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+def list_options(representative_only: bool = False):
+    """목록 조회용 로딩 옵션 (판매자/카테고리는 N:1 조인, 이미지는 별도 IN 쿼리로 일괄 로딩)"""
+    images = product_model.Product.images
+    if representative_only:
+        images = images.and_(product_model.ProductImage.is_representative.is_(True))
+    return (
+        joinedload(product_model.Product.seller),
+        joinedload(product_model.Product.category),
+        selectinload(images),
+    )
+
+def page_ids(stmt, skip: int, limit: int, cursor: Cursor, rank=None):
+    """2단계 목록 로딩의 1단계: 페이지에 해당하는 상품 ID만 조회"""
+    return paginate(stmt.with_only_columns(product_model.Product.product_id), skip, limit, cursor, rank)
+
+def products_by_ids(product_ids: List[int], representative_only: bool = False):
+    """2단계 목록 로딩의 2단계: ID 목록으로 상품과 이미지를 일괄 로딩"""
+    return select(product_model.Product)\
+        .options(*list_options(representative_only))\
+        .where(product_model.Product.product_id.in_(product_ids))
+
+def order_by_ids(products, product_ids: List[int]):
+    """IN 조회는 순서를 보장하지 않으므로 1단계의 정렬 순서로 복원"""
+    products_by_id = {product.product_id: product for product in products}
+    return [products_by_id[product_id] for product_id in product_ids if product_id in products_by_id]
+
+def product_detail(product_id: int):
+    """상품 상세 (판매자, 카테고리, 이미지 포함)"""
+    return select(product_model.Product)\
+        .options(
+            joinedload(product_model.Product.seller),
+            joinedload(product_model.Product.category),
+            selectinload(product_model.Product.images)
+        )\
+        .where(product_model.Product.product_id == product_id)
+
+def all_products():
+    return select(product_model.Product)
+
+def products_by_category(category_id: int):
+    return select(product_model.Product).where(product_model.Product.category_id == category_id)
+
+def products_by_seller(seller_id: int):
+    return select(product_model.Product).where(product_model.Product.seller_id == seller_id)
+
+def products_liked_by(user_id: int):
+    """사용자가 찜한 상품 (product_likes 의 (user_id, product_id) 유니크 인덱스로 조인)"""
+    return select(product_model.Product)\
+        .join(product_model.ProductLike, product_model.ProductLike.product_id == product_model.Product.product_id)\
+        .where(product_model.ProductLike.user_id == user_id)
+
+# ----- 조건부 요청(ETag) 용 버전 조회 -----
+def product_version(product_id: int):
+    """상품 상세 응답의 버전 (상품, 판매자 updated_at) - 이미지/카테고리 로딩 없음"""
+    return select(product_model.Product.updated_at, user_model.User.updated_at)\
+        .join(user_model.User, user_model.User.user_id == product_model.Product.seller_id)\
+        .where(product_model.Product.product_id == product_id)
+
+def page_versions(stmt, skip: int, limit: int, cursor: Cursor):
+    """목록 페이지의 버전 - 페이지에 들어갈 상품의 (ID, 상품 updated_at, 판매자 updated_at) 만 조회"""
+    stmt = stmt.with_only_columns(
+        product_model.Product.product_id,
+        product_model.Product.updated_at,
+        user_model.User.updated_at
+    ).join(user_model.User, user_model.User.user_id == product_model.Product.seller_id)
+    return paginate(stmt, skip, limit, cursor)
+
+def product_cards(category_id: int | None = None):
+    """카드 목록용 컬럼 제한 쿼리 (판매자 닉네임만 조인, 대표 이미지는 products 의 비정규화 컬럼 사용)"""
+    stmt = select(
+        product_model.Product.product_id,
+        product_model.Product.title,
+        product_model.Product.price,
+        product_model.Product.product_status,
+        product_model.Product.product_tag,
+        product_model.Product.trade_city,
+        product_model.Product.trade_district,
+        product_model.Product.likes,
+        product_model.Product.views,
+        product_model.Product.created_at,
+        user_model.User.nickname.label("seller_nickname"),
+        product_model.Product.representative_image_url,
+        product_model.Product.representative_thumbnail_url,
+    )\
+        .join(user_model.User, user_model.User.user_id == product_model.Product.seller_id)
+    if category_id is not None:
+        stmt = stmt.where(product_model.Product.category_id == category_id)
+    return stmt
+
+# ----- 검색 -----
+def search_filter(stmt, keyword: str, filters: product_schema.ProductSearchFilter):
+    """검색어(제목/내용, pg_trgm GIN 인덱스) 및 선택 필터 적용"""
+    # 검색어의 \, %, _ 는 와일드카드가 아닌 문자 그대로 검색
+    escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    stmt = stmt.where(or_(
+        product_model.Product.title.ilike(pattern, escape="\\"),
+        product_model.Product.content.ilike(pattern, escape="\\")
+    ))
+
+    if filters.category_id is not None:
+        stmt = stmt.where(product_model.Product.category_id == filters.category_id)
+    if filters.min_price is not None:
+        stmt = stmt.where(product_model.Product.price >= filters.min_price)
+    if filters.max_price is not None:
+        stmt = stmt.where(product_model.Product.price <= filters.max_price)
+    if filters.trade_city:
+        stmt = stmt.where(product_model.Product.trade_city == filters.trade_city)
+    if filters.trade_district:
+        stmt = stmt.where(product_model.Product.trade_district == filters.trade_district)
+    if filters.product_tag is not None:
+        stmt = stmt.where(product_model.Product.product_tag == product_model.ProductTagEnum(filters.product_tag.value))
+    if filters.product_status is not None:
+        stmt = stmt.where(product_model.Product.product_status == product_model.ProductStatusEnum(filters.product_status.value))
+    return stmt
+
+def search_rank(keyword: str, filters: product_schema.ProductSearchFilter):
+    """관련도순 정렬일 때의 순위 식 (제목 유사도를 내용보다 높게 반영)"""
+    if filters.sort != product_schema.ProductSearchSort.RELEVANCE:
+        return None
+    return func.similarity(product_model.Product.title, keyword) \
+        + func.word_similarity(keyword, product_model.Product.content) * 0.5
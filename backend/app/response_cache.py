@@ -0,0 +1,242 @@
+# 응답 캐시 - 로그인과 무관한 공개 GET 응답(상품 목록/상세)의 직렬화된 JSON 바이트를 보관
+# + 조건부 요청(ETag / If-None-Match) 처리
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, NamedTuple, Optional
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+import serializers
+
+load_dotenv()
+
+# 응답을 캐시에 두는 시간 (초) - 다른 워커의 쓰기는 무효화가 전달되지 않으므로 짧게 유지
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 5))
+# 캐시가 사용할 최대 메모리 (바이트, 본문 + 헤더 기준)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+# 태그별 무효화 시점을 기억하는 최대 태그 수 (넘으면 모든 태그가 지금 무효화된 것으로 보고 비움)
+_MAX_INVALIDATED_TAGS = 10000
+
+# 무효화 태그
+PRODUCT_LIST_TAG = "product_list"  # 모든 상품 목록 (전체, 카테고리별)
+
+def product_tag(product_id: int) -> str:
+    """상품 상세 응답의 태그"""
+    return f"product:{product_id}"
+
+# ----- ETag -----
+def weak_etag(*versions) -> str:
+    """응답 내용을 결정하는 값들(페이지 키, 상품 ID, updated_at 등)로 약한 ETag 생성"""
+    digest = hashlib.sha1(repr(versions).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str | None) -> bool:
+    """If-None-Match 에 etag 가 있는지 (GET 이므로 약한 비교)"""
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+def not_modified(etag: str) -> Response:
+    """본문 없는 304 응답"""
+    return Response(status_code=304, headers={"ETag": etag})
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: dict[str, str]
+
+    def to_response(self, request: Request | None = None) -> Response:
+        """저장된 바이트로 응답 (요청의 If-None-Match 가 저장된 ETag 와 같으면 304)"""
+        etag = self.headers.get("ETag")
+        if request is not None and etag_matches(request, etag):
+            return not_modified(etag)
+        return Response(content=self.body, media_type="application/json", headers=self.headers)
+
+    @classmethod
+    def from_orm(cls, adapter: TypeAdapter, value, headers: dict[str, str] | None = None) -> "CachedResponse":
+        """ORM 객체를 response_model 과 같은 형태의 JSON 바이트로 직렬화"""
+        return cls(serializers.to_json(adapter, value), headers or {})
+
+class _Entry(NamedTuple):
+    value: CachedResponse
+    expires_at: float
+    tags: tuple[str, ...]
+    size: int
+
+class ResponseCache:
+    """바이트 예산(LRU) + TTL + 태그 무효화 응답 캐시
+
+    - get_or_build: 같은 키의 동시 미스는 한 요청만 만들고 나머지는 그 결과를 기다림 (stampede 방지)
+    - invalidate: crud 쓰기 후 관련 태그의 항목 제거 (스레드풀의 동기 라우트에서도 호출되므로 스레드 안전)
+    - 만드는 도중 그 항목의 태그가 무효화되면 결과를 저장하지 않음 (무효화 이전 데이터일 수 있으므로)
+      다른 태그의 무효화(다른 상품의 찜 등)는 영향을 주지 않도록 무효화 시점을 태그별로 기록
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._size = 0
+        self._generation = 0  # 무효화할 때마다 증가
+        self._invalidated: dict[str, int] = {}  # 태그별 마지막 무효화 시점의 _generation
+        self._invalidated_all = 0  # 모든 태그가 무효화된 것으로 보는 시점 (clear 등)
+        self._building: dict[str, asyncio.Future] = {}  # 이벤트 루프에서만 접근
+
+    @staticmethod
+    def key(name: str, **params) -> str:
+        """라우트 이름과 (검증된) 파라미터로 캐시 키 생성"""
+        return name + "?" + "&".join(f"{k}={params[k]!r}" for k in sorted(params))
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def generation(self) -> int:
+        """현재 무효화 시점 (만들기 전에 받아 두었다가 set 에 넘김)"""
+        with self._lock:
+            return self._generation
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str] = (), generation: int | None = None):
+        """항목 저장 (generation 이 주어졌고 그 뒤 tags 중 하나라도 무효화되었으면 저장하지 않음)"""
+        size = len(key) + len(value.body) + sum(len(k) + len(v) for k, v in value.headers.items())
+        if size > self.max_bytes:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and self._invalidated_since(tags, generation):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, time.monotonic() + self.ttl, tags, size)
+            self._size += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            # 예산을 넘으면 가장 오래 사용되지 않은 항목부터 제거
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        """lock 안에서 호출"""
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _invalidated_since(self, tags: tuple[str, ...], generation: int) -> bool:
+        """lock 안에서 호출"""
+        if self._invalidated_all > generation:
+            return True
+        return any(self._invalidated.get(tag, 0) > generation for tag in tags)
+
+    def invalidate(self, *tags: str):
+        """태그가 붙은 항목 제거"""
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                self._invalidated[tag] = self._generation
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+            if len(self._invalidated) > _MAX_INVALIDATED_TAGS:
+                self._invalidated.clear()
+                self._invalidated_all = self._generation
+
+    def clear(self):
+        """전체 제거 (여러 응답에 포함되는 판매자 정보 변경 등)"""
+        with self._lock:
+            self._generation += 1
+            self._invalidated.clear()
+            self._invalidated_all = self._generation
+            self._entries.clear()
+            self._tags.clear()
+            self._size = 0
+
+    async def get_or_build(
+        self, key: str, tags: Iterable[str], build: Callable[[], Awaitable[CachedResponse]]
+    ) -> CachedResponse:
+        """캐시된 응답을 반환하거나, 없으면 build 로 만들어 저장 (동시 미스는 하나의 build 결과를 공유)"""
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+            building = self._building.get(key)
+            if building is None:
+                break
+            try:
+                return await asyncio.shield(building)
+            except asyncio.CancelledError:
+                # 만들던 요청이 취소된 경우 다시 시도 (이 요청 자신이 취소된 경우는 그대로 전파)
+                if not building.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[key] = future
+        generation = self.generation()
+        try:
+            value = await build()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # 기다리던 요청들도 같은 예외(404 등)를 받음
+            future.set_exception(e)
+            future.exception()  # 기다리는 요청이 없어도 경고가 나지 않도록 조회 처리
+            raise
+        finally:
+            self._building.pop(key, None)
+
+        self.set(key, value, tags, generation)
+        future.set_result(value)
+        return value
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        tags: Iterable[str],
+        etag: Callable[[], Awaitable[Optional[str]]],
+        build: Callable[[Optional[str]], Awaitable[CachedResponse]],
+    ) -> Response:
+        """조건부 요청을 처리하며 캐시된 응답 반환
+
+        - 캐시 적중: 저장된 ETag 와 비교 (DB 접근 없음)
+        - 캐시 미스 + If-None-Match: etag() 의 가벼운 버전 조회만으로 304 응답 (본문 로딩/직렬화 없음)
+        - 그 외: build(etag) 로 만든 응답을 저장 (ETag 는 본문을 읽기 전에 계산해 본문보다 새로울 수 없음)
+        """
+        cached = self.get(key)
+        if cached is None:
+            current = None
+            if request.headers.get("if-none-match"):
+                current = await etag()
+                if etag_matches(request, current):
+                    return not_modified(current)
+
+            async def build_with_etag():
+                return await build(current if current is not None else await etag())
+
+            cached = await self.get_or_build(key, tags, build_with_etag)
+        return cached.to_response(request)
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL_SECONDS)
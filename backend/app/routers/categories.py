@@ -1,40 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from schemas import category_schema, product_schema
-from database import get_db
-import crud
+from database import get_async_db
+from pagination import get_cursor, next_cursor_headers
+from response_cache import response_cache, CachedResponse, PRODUCT_LIST_TAG, weak_etag
+from queries import Cursor
+from category_cache import category_cache
+import crud_async
+import serializers
 
 router = APIRouter()
 
 @router.get("", response_model=List[category_schema.CategoryResponse])
-def read_all_categories(db: Session = Depends(get_db)):
+async def read_all_categories(db: AsyncSession = Depends(get_async_db)):
     """모든 카테고리 목록 조회"""
-    categories = crud.get_all_categories(db)
+    categories = await category_cache.aget_all(db)
     return categories
 
 @router.get("/{category_id}", response_model=category_schema.CategoryResponse)
-def read_categories(category_id: int, db: Session = Depends(get_db)):
-    db_category = crud.get_category(db, category_id=category_id)
+async def read_categories(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_category = await category_cache.aget(db, category_id)
     if db_category is None:
         raise HTTPException(status_code=404, detail="카테고리를 찾을 수 없습니다.")
     return db_category
 
 @router.get("/{category_name:path}/products", response_model=List[product_schema.ProductResponse])
-def read_products_by_category_name(
+async def read_products_by_category_name(
+    request: Request,
     category_name: str = Path(..., title="카테고리 이름"),
     skip: int = 0,
     limit: int = 16,
-    db: Session = Depends(get_db)
+    cursor: Cursor = Depends(get_cursor),
+    representative_only: bool = Query(False, description="대표 이미지만 포함"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """특정 카테고리 이름에 속한 상품 목록 조회"""
-    # 카테고리 이름으로 존재 여부 확인
-    category = crud.get_category_by_name(db, name=category_name)
+    """특정 카테고리 이름에 속한 상품 목록 조회 (응답 캐시, ETag 사용)"""
+    # 카테고리 이름으로 존재 여부 확인 (캐시)
+    category = await category_cache.aget_by_name(db, category_name)
     if category is None:
         raise HTTPException(status_code=404, detail="카테고리를 찾을 수 없습니다.")
 
-    products = crud.get_products_by_category_name(
-        db, category_name=category_name, skip=skip, limit=limit
+    key = response_cache.key(
+        "category_products", category_id=category.category_id, skip=skip, limit=limit, cursor=cursor,
+        representative_only=representative_only
     )
-    return products
\ No newline at end of file
+
+    async def etag():
+        versions = await crud_async.get_product_versions(
+            db, skip=skip, limit=limit, cursor=cursor, category_id=category.category_id
+        )
+        return weak_etag(key, *versions)
+
+    async def build(current_etag):
+        products = await crud_async.get_products_by_category(
+            db, category_id=category.category_id, skip=skip, limit=limit, cursor=cursor,
+            representative_only=representative_only
+        )
+        return CachedResponse.from_orm(
+            serializers.product_list, products,
+            {**next_cursor_headers(products, limit), "ETag": current_etag}
+        )
+
+    return await response_cache.respond(request, key, (PRODUCT_LIST_TAG,), etag, build)
+
+@router.get("/{category_name:path}/products/cards", response_model=List[product_schema.ProductCardResponse])
+async def read_product_cards_by_category_name(
+    category_name: str = Path(..., title="카테고리 이름"),
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = Depends(get_cursor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """특정 카테고리 이름에 속한 상품 목록 조회 (카드 형태)"""
+    category = await category_cache.aget_by_name(db, category_name)
+    if category is None:
+        raise HTTPException(status_code=404, detail="카테고리를 찾을 수 없습니다.")
+
+    cards = await crud_async.get_product_cards(
+        db, skip=skip, limit=limit, cursor=cursor, category_id=category.category_id
+    )
+    return serializers.json_response(serializers.product_cards, cards, next_cursor_headers(cards, limit))
\ No newline at end of file
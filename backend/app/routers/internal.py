@@ -0,0 +1,40 @@
+# 운영용 내부 라우터 (INTERNAL_ALLOWED_HOSTS 에서 온 요청만 허용)
+import os
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from dotenv import load_dotenv
+
+from database import engine, async_engine
+from pool_metrics import pool_status
+from instrumentation import render_metrics
+
+load_dotenv()
+
+INTERNAL_ALLOWED_HOSTS = {
+    host.strip() for host in os.getenv("INTERNAL_ALLOWED_HOSTS", "127.0.0.1,::1").split(",") if host.strip()
+}
+
+def require_internal_client(request: Request):
+    """내부망(허용된 호스트)에서 온 요청인지 확인"""
+    if request.client is None or request.client.host not in INTERNAL_ALLOWED_HOSTS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="접근 권한이 없습니다.")
+
+router = APIRouter(dependencies=[Depends(require_internal_client)])
+# Prometheus 수집용 (/metrics, 접두사 없이 등록)
+metrics_router = APIRouter(dependencies=[Depends(require_internal_client)])
+
+@router.get("/db-pool")
+def read_db_pool_status():
+    """동기/비동기 엔진의 커넥션 풀 현황 (사용 중, overflow, 대기 시간 히스토그램)"""
+    return {
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.sync_engine.pool),
+    }
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """라우트별 응답 시간, 요청당 쿼리 수/DB 시간, N+1 의심 요청, 느린 쿼리, 커넥션 풀 지표 (Prometheus 텍스트 형식)"""
+    return PlainTextResponse(
+        render_metrics({"sync": engine, "async": async_engine.sync_engine}),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,47 +1,91 @@
 from fastapi import (
     APIRouter, Depends, HTTPException, status, Response, 
-    UploadFile, File, Form, Request
+    UploadFile, File, Form, Request, Query
 )
-from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from uuid import uuid4
-import os
-import shutil
-from database import get_db
-from schemas import product_schema
-from models import user_model
+import inspect
+from database import get_db, get_async_db
+from schemas import product_schema, user_schema
+from pagination import get_cursor, next_cursor_headers
+from response_cache import response_cache, CachedResponse, PRODUCT_LIST_TAG, product_tag, weak_etag
+from view_counter import view_counter
+from category_cache import category_cache
+from view_dedup import view_dedup_store
+from queries import Cursor
 import crud
+import crud_async
 import auth
+import image_pipeline
+import serializers
 
 router = APIRouter()
 
-viewed_products = {}
-
-# 이미지 저장 경로
-UPLOAD_DIR = "../static/product_images"
-os.makedirs(UPLOAD_DIR, exist_ok=True) # 없으면 자동 생성
-
-def save_image(upload_file: UploadFile) -> str:
-    """업로드된 이미지를 저장하고 파일 경로 반환"""
-    extension = upload_file.filename.split(".")[-1]
-    unique_filename = f"{uuid4()}.{extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
-    
-    return f"../static/product_images/{unique_filename}"
+def save_images(upload_files: List[UploadFile]) -> List[str]:
+    """업로드된 이미지들을 동시에 저장하고 URL 목록 반환"""
+    try:
+        return image_pipeline.save_images(upload_files)
+    except image_pipeline.ImageTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"이미지는 1장당 {image_pipeline.IMAGE_MAX_BYTES // (1024 * 1024)}MB 이하로 업로드해야 합니다."
+        )
+
+def get_search_filter(**params) -> product_schema.ProductSearchFilter:
+    """검색 필터 쿼리 파라미터 의존성
+    (Depends(ProductSearchFilter) 는 모델 검증 실패가 500 이 되므로 422 로 변환)"""
+    try:
+        return product_schema.ProductSearchFilter(**params)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("query", *error["loc"])}
+            for error in e.errors(include_url=False, include_context=False)
+        ])
+
+# 쿼리 파라미터는 ProductSearchFilter 필드 그대로 사용
+get_search_filter.__signature__ = inspect.signature(product_schema.ProductSearchFilter)
 
 @router.get("", response_model=List[product_schema.ProductResponse])
-def read_products(
+async def read_products(
+    request: Request,
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = Depends(get_cursor),
+    representative_only: bool = Query(False, description="대표 이미지만 포함"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """상품 전체 목록 조회 (응답 캐시, ETag 사용)"""
+    key = response_cache.key("products", skip=skip, limit=limit, cursor=cursor, representative_only=representative_only)
+
+    async def etag():
+        # 페이지 키 + 페이지에 들어갈 상품들의 (ID, updated_at)
+        return weak_etag(key, *await crud_async.get_product_versions(db, skip=skip, limit=limit, cursor=cursor))
+
+    async def build(current_etag):
+        products = await crud_async.get_all_product(
+            db, skip=skip, limit=limit, cursor=cursor, representative_only=representative_only
+        )
+        return CachedResponse.from_orm(
+            serializers.product_list, products,
+            {**next_cursor_headers(products, limit), "ETag": current_etag}
+        )
+
+    return await response_cache.respond(request, key, (PRODUCT_LIST_TAG,), etag, build)
+
+@router.get("/cards", response_model=List[product_schema.ProductCardResponse])
+async def read_product_cards(
     skip: int = 0,
     limit: int = 16,
-    db: Session = Depends(get_db)
+    cursor: Cursor = Depends(get_cursor),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """상품 전체 목록 조회"""
-    products = crud.get_all_product(db, skip=skip, limit=limit)
-    return products
+    """상품 전체 목록 조회 (카드 형태)"""
+    cards = await crud_async.get_product_cards(db, skip=skip, limit=limit, cursor=cursor)
+    return serializers.json_response(serializers.product_cards, cards, next_cursor_headers(cards, limit))
 
 @router.post("/", response_model=product_schema.ProductResponse, status_code=status.HTTP_201_CREATED)
 def create_product(
@@ -55,7 +99,7 @@ def create_product(
     trade_district: str = Form(None),
     product_tag: product_schema.ProductTag = Form(product_schema.ProductTag.NONE),
     db: Session = Depends(get_db),
-    current_user: user_model.User = Depends(auth.get_current_active_user)
+    current_user: user_schema.UserResponse = Depends(auth.get_current_active_user)
 ):
     """새상품 등록"""
     # 이미지 개수 확인
@@ -66,13 +110,13 @@ def create_product(
     if not (0 <= representative_image_index < len(images)):
         raise HTTPException(status_code=400, detail="유효하지 않은 대표 이미지 순서입니다.")
         
-    # 카테고리 존재 확인
-    if not crud.get_category(db, category_id=category_id):
+    # 카테고리 존재 확인 (캐시)
+    if not category_cache.get(db, category_id):
         raise HTTPException(status_code=404, detail="해당 카테고리를 찾을 수 없습니다.")
 
+    image_urls = save_images(images)
     image_schemas = []
-    for index, image_file in enumerate(images):
-        image_url = save_image(image_file)
+    for index, image_url in enumerate(image_urls):
         is_rep = (index == representative_image_index)
         image_schemas.append(product_schema.ProductImageCreate(image_url=image_url, is_representative=is_rep))
 
@@ -82,39 +126,93 @@ def create_product(
         images=image_schemas
     )
 
-    return crud.create_product(db=db, product=product_data, seller_id=current_user.user_id)
+    new_product = crud.create_product(db=db, product=product_data, seller_id=current_user.user_id)
+    # 썸네일/WebP 변환은 커밋 후 백그라운드에서 진행
+    image_pipeline.schedule_variants(image_urls)
+    return new_product
 
 @router.get("/search", response_model=List[product_schema.ProductResponse])
-def search_products(
+async def search_products(
     q: str = "",
     skip: int = 0,
     limit: int = 16,
-    db: Session = Depends(get_db)
+    cursor: Cursor = Depends(get_cursor),
+    representative_only: bool = Query(False, description="대표 이미지만 포함"),
+    filters: product_schema.ProductSearchFilter = Depends(get_search_filter),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """상품 제목으로 검색"""
+    """상품 검색 (제목/내용 + 카테고리, 가격, 지역, 태그, 상태 필터)"""
     if not q.strip():
         return[]
-    products = crud.search_products_by_title(db, query=q, skip=skip, limit=limit)
-    return products
+    products = await crud_async.search_products(
+        db, query=q, filters=filters, skip=skip, limit=limit, cursor=cursor,
+        representative_only=representative_only
+    )
+    # 관련도순은 offset 페이지네이션만 지원
+    headers = next_cursor_headers(products, limit) if filters.sort == product_schema.ProductSearchSort.LATEST else None
+    return serializers.json_response(serializers.product_list, products, headers)
+
+@router.get("/search/cards", response_model=List[product_schema.ProductCardResponse])
+async def search_product_cards(
+    q: str = "",
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = Depends(get_cursor),
+    filters: product_schema.ProductSearchFilter = Depends(get_search_filter),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """상품 검색 (카드 형태)"""
+    if not q.strip():
+        return []
+    cards = await crud_async.search_product_cards(db, query=q, filters=filters, skip=skip, limit=limit, cursor=cursor)
+    headers = next_cursor_headers(cards, limit) if filters.sort == product_schema.ProductSearchSort.LATEST else None
+    return serializers.json_response(serializers.product_cards, cards, headers)
+
+@router.get("/likes", response_model=List[product_schema.ProductLikeStatus])
+def read_like_statuses(
+    product_ids: List[int] = Query(..., max_length=100, description="찜 여부를 확인할 상품 ID 목록 (최대 100개)"),
+    db: Session = Depends(get_db),
+    current_user: user_schema.UserResponse = Depends(auth.get_current_active_user)
+):
+    """여러 상품에 대한 현재 사용자의 찜 여부 일괄 조회"""
+    liked_ids = crud.get_liked_product_ids(db, user_id=current_user.user_id, product_ids=product_ids)
+    return [
+        product_schema.ProductLikeStatus(product_id=product_id, liked=product_id in liked_ids)
+        for product_id in product_ids
+    ]
 
 @router.get("/{product_id}", response_model=product_schema.ProductResponse)
-def read_product(product_id: int, request: Request, db: Session = Depends(get_db)):
-    client_ip = request.client.host
-    now = datetime.now()
-
-    # 최근 1분 내에 조회한 기록이 있으면 조회수 증가하지 않음
-    last_view = viewed_products.get(client_ip, {}).get(product_id)
-    if not last_view or now - last_view > timedelta(minutes=0.001):
-        db_product = crud.get_product(db, product_id=product_id)
-        db_product.views += 1
-        db.commit()
-        db.refresh(db_product)
-
-        viewed_products.setdefault(client_ip, {})[product_id] = now
+async def read_product(product_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """상품 상세 조회 (응답 캐시, ETag 사용)"""
+    async def etag():
+        # 상품 ID + 상품/판매자 updated_at (상품이 없으면 None)
+        version = await crud_async.get_product_version(db, product_id)
+        return weak_etag("product", product_id, *version) if version is not None else None
+
+    async def build(current_etag):
+        db_product = await crud_async.get_product(db, product_id=product_id)
+        if db_product is None:
+            raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
+        return CachedResponse.from_orm(
+            serializers.product_detail, db_product,
+            {"ETag": current_etag} if current_etag else None
+        )
+
+    response = await response_cache.respond(
+        request, response_cache.key("product", product_id=product_id), (product_tag(product_id),), etag, build
+    )
+
+    # 최근 VIEW_DEDUP_WINDOW_SECONDS 내에 조회한 기록이 있으면 조회수 증가하지 않음
+    # (SQLite 등 I/O 가 있는 저장소는 이벤트 루프를 막지 않도록 스레드풀에서 확인)
+    if view_dedup_store.blocking:
+        counted = await run_in_threadpool(view_dedup_store.should_count, request.client.host, product_id)
     else:
-        db_product = crud.get_product(db, product_id=product_id)
+        counted = view_dedup_store.should_count(request.client.host, product_id)
+    if counted:
+        # 조회수는 view_counter가 모아서 주기적으로 반영 (요청 중 쓰기 트랜잭션 없음)
+        view_counter.increment(product_id)
 
-    return db_product
+    return response
 
 @router.put("/{product_id}", response_model=product_schema.ProductResponse)
 def update_product(
@@ -133,7 +231,7 @@ def update_product(
     representative_image_index: int = Form(0), # 전체 이미지 목록 기준 대표 이미지 인덱스
     # ---------------------------------
     db: Session = Depends(get_db),
-    current_user: user_model.User = Depends(auth.get_current_active_user),
+    current_user: user_schema.UserResponse = Depends(auth.get_current_active_user),
 ):
     """상품 정보 수정 (이미지 포함)"""
     db_product = crud.get_product(db, product_id=product_id)
@@ -145,7 +243,6 @@ def update_product(
 
     # --- 이미지 처리 로직 추가 ---
     current_images = db_product.images[:] # 기존 이미지 목록 복사
-    images_to_delete = []
     final_image_schemas = [] # 최종적으로 DB에 저장될 이미지 스키마 목록
 
     # 1. 유지할 이미지 처리
@@ -164,12 +261,7 @@ def update_product(
              print(f"Warning: Keep image ID {img_id_to_keep} not found for product {product_id}")
              # 필요시 여기서 오류 처리
 
-    # 2. 삭제할 이미지 결정 (current_images 중 keep_image_ids에 없는 것)
-    for img in current_images:
-        if img.image_id not in keep_image_ids:
-            images_to_delete.append(img) # 삭제 대상 모델 객체 추가
-
-    # 3. 새로 추가된 이미지 처리
+    # 2. 새로 추가된 이미지 처리 (keep_image_ids에 없는 기존 이미지는 crud에서 참조 해제)
     new_image_urls = []
     if new_images:
          total_images = len(keep_image_ids) + len(new_images)
@@ -178,15 +270,14 @@ def update_product(
          if total_images == 0:
               raise HTTPException(status_code=400, detail="이미지는 최소 1개 이상 등록해야 합니다.")
 
-         for image_file in new_images:
-             saved_url = save_image(image_file)
-             new_image_urls.append(saved_url)
+         new_image_urls = save_images(new_images)
+         for saved_url in new_image_urls:
              final_image_schemas.append(product_schema.ProductImageCreate(
                  image_url=saved_url,
                  is_representative=False # 대표 여부는 나중에 설정
              ))
 
-    # 4. 대표 이미지 설정
+    # 3. 대표 이미지 설정
     if not (0 <= representative_image_index < len(final_image_schemas)):
          # 기본값으로 첫 번째 이미지를 대표로 설정하거나 오류 발생
          if final_image_schemas:
@@ -212,19 +303,19 @@ def update_product(
     )
     # -----------------------------
 
-    # CRUD 함수 호출 시 삭제할 이미지 객체 목록도 전달
-    return crud.update_product(
+    updated_product = crud.update_product(
         db=db,
         db_product=db_product,
-        product_update=product_update_data,
-        images_to_delete=images_to_delete # 삭제할 이미지 객체 목록 전달
+        product_update=product_update_data
     )
+    image_pipeline.schedule_variants(new_image_urls)
+    return updated_product
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
-    current_user: user_model.User = Depends(auth.get_current_active_user)
+    current_user: user_schema.UserResponse = Depends(auth.get_current_active_user)
 ):
     """상품 삭제"""
     db_product = crud.get_product(db, product_id=product_id)
@@ -234,11 +325,6 @@ def delete_product(
     if db_product.seller_id != current_user.user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="상품을 삭제할 권한이 없습니다.")
 
-    for image in db_product.images:
-        file_path = "../static/product_images" + image.image_url
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
     crud.delete_product(db=db, db_product=db_product)
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -247,18 +333,15 @@ def delete_product(
 def like_product(
     product_id: int,
     db: Session = Depends(get_db),
-    current_user: user_model.User = Depends(auth.get_current_active_user)
+    current_user: user_schema.UserResponse = Depends(auth.get_current_active_user)
 ):
     """상품 찜하기"""
-    db_product = crud.get_product(db, product_id=product_id)
-    if not db_product:
+    created = crud.create_like(db, user_id=current_user.user_id, product_id=product_id)
+    if created is None:
         raise HTTPException(status_code=404, detail="상품을 찾을 수 없습니다.")
-    
-    db_like = crud.get_like(db, user_id=current_user.user_id, product_id=product_id)
-    if db_like:
+    if not created:
         raise HTTPException(status_code=400, detail="이미 찜한 상품입니다.")
-        
-    crud.create_like(db, user_id=current_user.user_id, product_id=product_id)
+
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -266,13 +349,10 @@ def like_product(
 def unlike_product(
     product_id: int,
     db: Session = Depends(get_db),
-    current_user: user_model.User = Depends(auth.get_current_active_user)
+    current_user: user_schema.UserResponse = Depends(auth.get_current_active_user)
 ):
     """상품 찜 취소하기"""
-    db_like = crud.get_like(db, user_id=current_user.user_id, product_id=product_id)
-    if not db_like:
+    if not crud.delete_like(db, user_id=current_user.user_id, product_id=product_id):
         raise HTTPException(status_code=404, detail="찜하지 않은 상품입니다.")
-        
-    crud.delete_like(db, db_like=db_like)
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
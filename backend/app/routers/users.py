@@ -1,5 +1,5 @@
 # 회원 관련 라우터
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
@@ -7,11 +7,14 @@ from typing import Annotated, List
 
 from database import get_db
 from schemas import user_schema, product_schema
-from models import user_model, product_model
+from pagination import get_cursor, next_cursor_headers
+from queries import Cursor
+from response_cache import weak_etag, etag_matches, not_modified
 
 import utils
 import auth
 import crud
+import serializers
 
 router = APIRouter()
 
@@ -76,7 +79,7 @@ def login_for_access_token(
 @router.post("/refresh", status_code=status.HTTP_200_OK)
 def refresh_access_token(
     response: Response,
-    current_user: user_model.User = Depends(auth.get_current_user_from_refresh_token)
+    current_user: user_schema.UserResponse = Depends(auth.get_current_user_from_refresh_token)
 ):
     new_access_token = auth.create_access_token(data={"sub": current_user.email})
 
@@ -118,14 +121,14 @@ def logout(response: Response):
 
 
 @router.get("/me", response_model=user_schema.UserResponse)
-def read_users_me(current_user: Annotated[user_model.User, Depends(auth.get_current_active_user)]):
+def read_users_me(current_user: Annotated[user_schema.UserResponse, Depends(auth.get_current_active_user)]):
     return current_user
 
 @router.patch("/me", response_model=user_schema.UserResponse)
 def update_user_me(
     user_update: user_schema.UserUpdate,
     db: Session = Depends(get_db),
-    current_user: user_model.User = Depends(auth.get_current_active_user)
+    current_user: user_schema.UserResponse = Depends(auth.get_current_active_user)
 ):
     """현재 로그인된 사용자 정보 수정 (닉네임, 비밀번호)"""
     # 만약 변경하려는 닉네임이 제공되었고, 현재 닉네임과 다르다면 중복 검사
@@ -134,34 +137,71 @@ def update_user_me(
         if existing_user:
             raise HTTPException(status_code=400, detail="이미 사용 중인 닉네임입니다.")
 
-    return crud.update_user(db=db, db_user=current_user, user_update=user_update)
+    # current_user 는 캐시된 스냅샷이므로 수정할 ORM 객체를 조회
+    db_user = crud.get_user_by_email(db, email=current_user.email)
+    return crud.update_user(db=db, db_user=db_user, user_update=user_update)
 
 @router.get("/me/products", response_model=List[product_schema.ProductResponse])
 def read_my_products(
+    request: Request,
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = Depends(get_cursor),
+    representative_only: bool = Query(False, description="대표 이미지만 포함"),
     db: Session = Depends(get_db),
-    current_user: user_model.User = Depends(auth.get_current_active_user)
+    current_user: user_schema.UserResponse = Depends(auth.get_current_active_user)
 ):
-    products = db.query(product_model.Product).filter(
-        product_model.Product.seller_id == current_user.user_id
-    ).all()
-
-    return products
+    """현재 사용자가 등록한 상품 목록 조회 (ETag 사용)"""
+    # 본문을 읽기 전에 페이지 버전만 조회해 바뀌지 않았으면 304
+    versions = crud.get_user_product_versions(db, user_id=current_user.user_id, skip=skip, limit=limit, cursor=cursor)
+    etag = weak_etag("user_products", current_user.user_id, skip, limit, cursor, representative_only, *versions)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    products = crud.get_products_by_user(
+        db, user_id=current_user.user_id, skip=skip, limit=limit, cursor=cursor, representative_only=representative_only
+    )
+    return serializers.json_response(serializers.product_list, products, {**next_cursor_headers(products, limit), "ETag": etag})
 
 
 @router.get("/{user_id}/products", response_model=List[product_schema.ProductResponse])
 def read_user_products(
     user_id: int,
+    request: Request,
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = Depends(get_cursor),
+    representative_only: bool = Query(False, description="대표 이미지만 포함"),
     db: Session = Depends(get_db)
 ):
-    """특정 사용자가 등록한 상품 목록 조회"""
-    products = crud.get_products_by_user(db, user_id=user_id)
-    
-    return products
+    """특정 사용자가 등록한 상품 목록 조회 (ETag 사용)"""
+    versions = crud.get_user_product_versions(db, user_id=user_id, skip=skip, limit=limit, cursor=cursor)
+    etag = weak_etag("user_products", user_id, skip, limit, cursor, representative_only, *versions)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    products = crud.get_products_by_user(
+        db, user_id=user_id, skip=skip, limit=limit, cursor=cursor, representative_only=representative_only
+    )
+    return serializers.json_response(serializers.product_list, products, {**next_cursor_headers(products, limit), "ETag": etag})
 
 @router.get("/me/likes", response_model=List[product_schema.ProductResponse])
 def read_my_liked_products(
+    request: Request,
+    skip: int = 0,
+    limit: int = 16,
+    cursor: Cursor = Depends(get_cursor),
+    representative_only: bool = Query(False, description="대표 이미지만 포함"),
     db: Session = Depends(get_db),
-    current_user: user_model.User = Depends(auth.get_current_active_user)
+    current_user: user_schema.UserResponse = Depends(auth.get_current_active_user)
 ):
-    """현재 사용자가 찜한 상품 목록 조회"""
-    return crud.get_liked_products_by_user(db, user_id=current_user.user_id)
\ No newline at end of file
+    """현재 사용자가 찜한 상품 목록 조회 (ETag 사용)"""
+    versions = crud.get_liked_product_versions(db, user_id=current_user.user_id, skip=skip, limit=limit, cursor=cursor)
+    etag = weak_etag("liked_products", current_user.user_id, skip, limit, cursor, representative_only, *versions)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    products = crud.get_liked_products_by_user(
+        db, user_id=current_user.user_id, skip=skip, limit=limit, cursor=cursor, representative_only=representative_only
+    )
+    return serializers.json_response(serializers.product_list, products, {**next_cursor_headers(products, limit), "ETag": etag})
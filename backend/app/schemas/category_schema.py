@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class CategoryBase(BaseModel):
     name: str = Field(..., max_length=50, description="카테고리 이름")
@@ -12,5 +12,4 @@ class CategoryResponse(BaseModel):
     name: str = Field(..., description="카테고리 이름")
     icon_name: str | None = Field(default=None, description="리액트 아이콘 이름")
 
-    class ConfigDict:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from datetime import datetime
 from enum import Enum
 from typing import List, Optional
@@ -29,9 +29,15 @@ class ProductImageCreate(ProductImageBase):
 class ProductImageResponse(ProductImageBase):
     image_id: int
     product_id: int
+    thumbnail_url: Optional[str] = Field(default=None, description="썸네일 URL (변환 전에는 null)")
+    webp_url: Optional[str] = Field(default=None, description="WebP 변환본 URL (변환 전에는 null)")
 
-    class ConfigDict:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+# ----- 상품 찜 -----
+class ProductLikeStatus(BaseModel):
+    product_id: int
+    liked: bool = Field(..., description="현재 사용자의 찜 여부")
 
 # ----- 상품 -----
 class ProductBase(BaseModel):
@@ -88,10 +94,49 @@ class ProductResponse(ProductBase):
     likes: int
     created_at: datetime
     updated_at: datetime
+    representative_image_url: Optional[str] = Field(default=None, description="대표 이미지 URL")
+    representative_thumbnail_url: Optional[str] = Field(default=None, description="대표 이미지 썸네일 URL")
 
     seller: UserResponse
     category: CategoryResponse
     images: List[ProductImageResponse]
 
-    class ConfigDict:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# ----- 상품 검색 -----
+class ProductSearchSort(str, Enum):
+    LATEST = "latest"
+    RELEVANCE = "relevance"
+
+class ProductSearchFilter(BaseModel):
+    category_id: Optional[int] = Field(default=None, description="카테고리 ID")
+    min_price: Optional[int] = Field(default=None, ge=0, description="최소 가격")
+    max_price: Optional[int] = Field(default=None, ge=0, description="최대 가격")
+    trade_city: Optional[str] = Field(default=None, max_length=10, description="거래 희망 지역 (시)")
+    trade_district: Optional[str] = Field(default=None, max_length=10, description="거래 희망 지역 (구)")
+    product_tag: Optional[ProductTag] = Field(default=None, description="상품 태그")
+    product_status: Optional[ProductStatus] = Field(default=None, description="상품 상태")
+    sort: ProductSearchSort = Field(default=ProductSearchSort.LATEST, description="정렬 (latest: 최신순, relevance: 관련도순)")
+
+    @model_validator(mode='after')
+    def validate_price_range(self):
+        if self.min_price is not None and self.max_price is not None and self.min_price > self.max_price:
+            raise ValueError('최소 가격은 최대 가격보다 클 수 없습니다.')
+        return self
+
+# ----- 상품 카드 (목록용 경량 응답) -----
+class ProductCardResponse(BaseModel):
+    product_id: int
+    title: str
+    price: int
+    product_status: ProductStatus
+    product_tag: ProductTag
+    trade_city: Optional[str] = None
+    trade_district: Optional[str] = None
+    likes: int
+    views: int
+    seller_nickname: str = Field(..., description="판매자 닉네임")
+    representative_image_url: Optional[str] = Field(default=None, description="대표 이미지 URL")
+    representative_thumbnail_url: Optional[str] = Field(default=None, description="대표 이미지 썸네일 URL")
+
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
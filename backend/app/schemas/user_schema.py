@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import datetime
 from typing import Optional
 
@@ -24,8 +24,7 @@ class UserResponse(BaseModel):
     created_at: datetime = Field(..., description="가입 일시")
     updated_at: datetime = Field(..., description="정보 수정 일시")
 
-    class ConfigDict:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # 토큰 스키마
 class Token(BaseModel):
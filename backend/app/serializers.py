@@ -0,0 +1,21 @@
+# 응답 직렬화 빠른 경로 - ORM 객체를 한 번만 검증하고 pydantic-core 로 바로 JSON 바이트를 만듦
+# FastAPI 기본 경로(response_model 검증 → 파이썬 객체 변환 → JSON 인코딩) 대신 목록/피드 라우트에서 사용
+# 라우트의 response_model 은 문서(OpenAPI)용으로 그대로 둠
+from typing import List
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from schemas import product_schema
+
+# 스키마별 직렬화기 (생성 비용이 크므로 모듈 로드 시 한 번만 만듦)
+product_detail = TypeAdapter(product_schema.ProductResponse)
+product_list = TypeAdapter(List[product_schema.ProductResponse])
+product_cards = TypeAdapter(List[product_schema.ProductCardResponse])
+
+def to_json(adapter: TypeAdapter, value) -> bytes:
+    """ORM 객체(또는 Row)를 from_attributes 로 한 번 검증한 뒤 JSON 바이트로 직렬화"""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+def json_response(adapter: TypeAdapter, value, headers: dict[str, str] | None = None, status_code: int = 200) -> Response:
+    """직렬화한 바이트를 그대로 담은 응답 (FastAPI 가 다시 검증/인코딩하지 않음)"""
+    return Response(content=to_json(adapter, value), status_code=status_code, media_type="application/json", headers=headers)
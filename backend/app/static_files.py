@@ -0,0 +1,88 @@
+# 정적 파일(상품 이미지) 서빙 - 캐시 헤더, ETag/304, WebP 협상, X-Accel-Redirect
+import os
+import re
+import stat
+import anyio
+from dotenv import load_dotenv
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+load_dotenv()
+
+# 해시 이름이 아닌 파일(이전 uuid 이름 등)의 캐시 유지 시간 (초)
+STATIC_MAX_AGE_SECONDS = int(os.getenv("STATIC_MAX_AGE_SECONDS", 3600))
+# Accept 에 image/webp 가 있으면 같은 해시의 WebP 변환본을 대신 응답
+STATIC_WEBP_NEGOTIATION = os.getenv("STATIC_WEBP_NEGOTIATION", "true").lower() == "true"
+# nginx 등 앞단 프록시가 파일을 직접 보내도록 할 내부 경로 (예: "/_static/", 비우면 앱이 직접 전송)
+STATIC_ACCEL_REDIRECT_PREFIX = os.getenv("STATIC_ACCEL_REDIRECT_PREFIX", "")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# image_pipeline 이 만드는 내용 해시 기반 파일 이름 (원본, 원본 이름 뒤에 .thumb.jpg / .webp 를 붙인 변환본)
+_HASHED_NAME = re.compile(r"^(?P<hash>[0-9a-f]{64})\.(?P<ext>[a-z0-9]+)(?P<variant>\.thumb\.jpg|\.webp)?$")
+# WebP 로 바꿔 보낼 수 있는 원본 확장자 (gif 는 애니메이션이 사라지므로 제외)
+_WEBP_SOURCE_EXTENSIONS = {"jpg", "jpeg", "png", "bmp", "tif", "tiff"}
+
+def _accepts_webp(scope: Scope) -> bool:
+    return "image/webp" in Headers(scope=scope).get("accept", "")
+
+class ImageStaticFiles(StaticFiles):
+    """상품 이미지용 StaticFiles
+
+    - 해시 이름 파일은 내용이 바뀌지 않으므로 1년 immutable 캐시 + 해시 기반 강한 ETag
+    - If-None-Match / If-Modified-Since 는 304, Range 요청은 FileResponse 가 206 으로 처리
+    - 파일 전송은 FileResponse 가 서버의 pathsend 확장을 지원하면 그쪽으로 넘기고,
+      STATIC_ACCEL_REDIRECT_PREFIX 가 있으면 X-Accel-Redirect 로 프록시에 맡김 (sendfile)
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        match = _HASHED_NAME.match(os.path.basename(path))
+        negotiable = (
+            STATIC_WEBP_NEGOTIATION
+            and match is not None
+            and match["variant"] is None
+            and match["ext"] in _WEBP_SOURCE_EXTENSIONS
+        )
+
+        response = None
+        if negotiable and scope["method"] in ("GET", "HEAD") and _accepts_webp(scope):
+            webp_path = os.path.join(os.path.dirname(path), f"{match['hash']}.{match['ext']}.webp")
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, webp_path)
+            # 변환 전이면 원본으로 응답
+            if stat_result and stat.S_ISREG(stat_result.st_mode):
+                response = self.file_response(full_path, stat_result, scope)
+
+        if response is None:
+            response = await super().get_response(path, scope)
+        if negotiable:
+            response.headers["vary"] = "Accept"
+        return response
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        if _HASHED_NAME.match(os.path.basename(full_path)):
+            # 이름이 곧 내용이므로 파일 이름 자체를 강한 ETag 로 사용
+            response.headers["etag"] = f'"{os.path.basename(full_path)}"'
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["cache-control"] = f"public, max-age={STATIC_MAX_AGE_SECONDS}"
+
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        if STATIC_ACCEL_REDIRECT_PREFIX and status_code == 200:
+            return self._accel_redirect(response, full_path)
+        return response
+
+    def _accel_redirect(self, response: Response, full_path) -> Response:
+        """파일 본문 대신 X-Accel-Redirect 헤더만 보내 프록시가 직접 전송하도록 함"""
+        relative_path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name in ("content-type", "etag", "last-modified", "cache-control", "vary")
+        }
+        headers["x-accel-redirect"] = STATIC_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + relative_path
+        return Response(status_code=200, headers=headers)
@@ -0,0 +1,52 @@
+# 요청 본문 크기 제한 - multipart 본문을 임시 파일로 다 받아두기(spool) 전에 413 으로 거절
+import os
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from image_pipeline import IMAGE_MAX_BYTES
+
+load_dotenv()
+
+# 요청 본문 최대 크기 (기본: 상품 이미지 최대 10장 + 폼 필드 여유 1MB)
+UPLOAD_MAX_BODY_BYTES = int(os.getenv("UPLOAD_MAX_BODY_BYTES", 10 * IMAGE_MAX_BYTES + 1024 * 1024))
+
+_DETAIL = "요청 본문이 너무 큽니다."
+
+class UploadSizeLimitMiddleware:
+    """본문이 max_bytes 를 넘는 요청 거절
+
+    - Content-Length 가 크면 본문을 읽지 않고 바로 413
+    - Content-Length 가 없는(chunked) 요청은 받은 양을 세다가 넘는 순간 HTTPException(413)
+      (FastAPI 가 폼 파싱 중 발생한 HTTPException 은 그대로 전달하므로 413 응답이 됨)
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = UPLOAD_MAX_BODY_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse({"detail": _DETAIL}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=_DETAIL)
+            return message
+
+        await self.app(scope, receive_limited, send)
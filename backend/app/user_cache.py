@@ -0,0 +1,17 @@
+# 인증된 사용자 정보 캐시 (토큰 subject(email) -> 사용자 스냅샷)
+import os
+from dotenv import load_dotenv
+
+from cache import TTLCache
+
+load_dotenv()
+
+# 회원 정보 변경/비활성화는 invalidate 로 즉시 반영되고, 그 외에는 TTL 이 지나면 다시 조회
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", 10000))
+
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL_SECONDS)
+
+def invalidate_user(email: str):
+    """회원 정보가 바뀌었을 때 캐시된 스냅샷 제거"""
+    user_cache.pop(email)
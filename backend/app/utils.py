@@ -1,9 +1,96 @@
 # 비밀번호 해싱
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
 from passlib.context import CryptContext
 
+load_dotenv()
+
+# bcrypt cost (값을 바꾸면 기존 해시는 다음 로그인 때 새 cost 로 재해싱됨)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# 해싱 전용 프로세스 수 (0 이면 요청 스레드에서 직접 처리)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+# 처리 중 + 대기 중인 해싱 작업의 최대 개수 (초과 시 즉시 PasswordHasherBusy)
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 16))
+
 # bcrypt 알고리즘을 사용하도록 CryptContext 설정
 # deprecated="auto": 안전하지 않은 알고리즘 사용 시 경고.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+class PasswordHasherBusy(Exception):
+    """해싱 작업 대기열이 가득 찬 경우"""
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(PASSWORD_HASH_QUEUE_LIMIT, 1))
+
+def new_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """작업 프로세스 풀 생성
+
+    스레드/DB 커넥션 풀을 가진 서버 프로세스를 fork 하면 잠긴 락이나 소켓까지 복제되므로
+    forkserver(지원하지 않는 OS 는 spawn)로 깨끗한 프로세스를 띄움
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = new_process_pool(PASSWORD_HASH_WORKERS)
+        return _executor
+
+def start_password_executor():
+    """해싱 프로세스 풀 생성 (애플리케이션 시작 시, 첫 로그인 요청 중에 만들지 않도록)"""
+    if PASSWORD_HASH_WORKERS > 0:
+        _get_executor()
+
+def _discard_executor(broken: ProcessPoolExecutor):
+    """작업 프로세스가 비정상 종료되어 못 쓰게 된 풀을 버림 (다음 _get_executor 가 새로 만듦)"""
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_password_executor():
+    """해싱 프로세스 풀 종료 (애플리케이션 종료 시)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def _run(fn, *args):
+    """해싱 작업을 전용 프로세스 풀에서 실행 (GIL 과 요청 스레드 CPU 점유를 피함)"""
+    if PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+    # 대기열이 가득 차면 기다리지 않고 바로 실패 (로그인 폭주가 다른 요청을 막지 않도록)
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        executor = _get_executor()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # 작업 프로세스가 죽으면(OOM 등) 풀을 새로 만들어 한 번만 재시도 (해싱/검증은 다시 해도 안전)
+            _discard_executor(executor)
+            return _get_executor().submit(fn, *args).result()
+    finally:
+        _slots.release()
+
+# 프로세스 풀로 전달되는 함수는 모듈 수준 함수여야 함 (pickle)
+def _hash(password: str):
+    return pwd_context.hash(password)
+
+def _verify(plain_password: str, hashed_password: str):
+    return pwd_context.verify(plain_password, hashed_password)
+
+def _verify_and_update(plain_password: str, hashed_password: str):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
 
 def hash_password(password: str):
     """
@@ -11,7 +98,7 @@ def hash_password(password: str):
     :param password: 사용자가 입력한 평문 비밀번호
     :return: bcrpyt로 해싱된 비밀번호 문자열
     """
-    return pwd_context.hash(password)
+    return _run(_hash, password)
 
 def verify_password(plain_password: str, hashed_password: str):
     """
@@ -20,4 +107,13 @@ def verify_password(plain_password: str, hashed_password: str):
     :param hashed_password: 데이터베이스에 저장된 해싱된 비밀번호
     :return: 두 비밀번호가 일치하면 True, 그렇지 않으면 False
     """
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return _run(_verify, plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    비밀번호를 비교하고, 해시 설정(cost 등)이 바뀌었으면 새 해시도 함께 반환하는 함수.
+    :param plain_password: 사용자가 입력한 평문 비밀번호
+    :param hashed_password: 데이터베이스에 저장된 해싱된 비밀번호
+    :return: (일치 여부, 새 해시 또는 재해싱이 필요 없으면 None)
+    """
+    return _run(_verify_and_update, plain_password, hashed_password)
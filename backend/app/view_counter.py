@@ -0,0 +1,77 @@
+# 조회수 버퍼링 카운터
+import asyncio
+import os
+import threading
+from dotenv import load_dotenv
+from sqlalchemy import bindparam, func
+
+from database import engine
+from models import product_model
+
+load_dotenv()
+
+# 모아둔 조회수를 DB에 반영하는 주기 (초)
+VIEW_FLUSH_INTERVAL_SECONDS = float(os.getenv("VIEW_FLUSH_INTERVAL_SECONDS", 5))
+
+class ViewCounter:
+    """조회수 증가분을 메모리에 모았다가 주기적으로 일괄 UPDATE 하는 카운터
+
+    증가분(views = views + n)만 반영하므로 워커별로 따로 모아도 합계가 맞음
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[int, int] = {}
+
+    def increment(self, product_id: int, count: int = 1):
+        """조회수 증가분 기록 (DB 접근 없음)"""
+        with self._lock:
+            self._pending[product_id] = self._pending.get(product_id, 0) + count
+
+    def flush(self) -> int:
+        """모아둔 증가분을 한 트랜잭션의 일괄 UPDATE로 반영하고 반영한 상품 수 반환"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        table = product_model.Product.__table__
+        stmt = table.update()\
+            .where(table.c.product_id == bindparam("b_product_id"))\
+            .values(
+                views=func.coalesce(table.c.views, 0) + bindparam("b_count"),
+                # onupdate(now()) 가 붙지 않도록 updated_at 유지 (조회수 반영으로 ETag 가 바뀌지 않게)
+                updated_at=table.c.updated_at,
+            )
+        # 상품 ID 순으로 갱신해 여러 워커가 동시에 반영할 때 교착을 피함
+        params = [
+            {"b_product_id": product_id, "b_count": count}
+            for product_id, count in sorted(pending.items())
+        ]
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(stmt, params)
+        except Exception:
+            # 실패한 증가분은 되돌려 두고 다음 주기에 다시 반영
+            with self._lock:
+                for product_id, count in pending.items():
+                    self._pending[product_id] = self._pending.get(product_id, 0) + count
+            raise
+        return len(pending)
+
+    async def run_periodic(self, interval: float = VIEW_FLUSH_INTERVAL_SECONDS):
+        """interval 마다 flush (lifespan에서 백그라운드 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(interval)
+            flush = asyncio.ensure_future(asyncio.to_thread(self.flush))
+            try:
+                await asyncio.shield(flush)
+            except asyncio.CancelledError:
+                # 종료로 취소되면 진행 중인 반영이 끝난 뒤 종료 (lifespan 의 마지막 flush 와 겹치지 않도록)
+                await asyncio.wait([flush])
+                raise
+            except Exception as e:
+                print(f"조회수 반영 실패: {e}")
+
+view_counter = ViewCounter()
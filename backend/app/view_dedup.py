@@ -0,0 +1,100 @@
+# 조회수 중복 방지 저장소
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dotenv import load_dotenv
+
+from cache import TTLCache
+
+load_dotenv()
+
+# 같은 사용자의 같은 상품 조회를 한 번으로 보는 시간 (초)
+VIEW_DEDUP_WINDOW_SECONDS = float(os.getenv("VIEW_DEDUP_WINDOW_SECONDS", 60))
+# memory: 워커별 메모리 저장소, sqlite: 같은 호스트의 워커들이 공유하는 저장소
+VIEW_DEDUP_BACKEND = os.getenv("VIEW_DEDUP_BACKEND", "memory")
+# memory 저장소의 최대 기록 수 (초과 시 가장 오래된 기록부터 제거)
+VIEW_DEDUP_MAX_ENTRIES = int(os.getenv("VIEW_DEDUP_MAX_ENTRIES", 100000))
+VIEW_DEDUP_SQLITE_PATH = os.getenv(
+    "VIEW_DEDUP_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "semi_view_dedup.sqlite3")
+)
+
+class ViewDedupStore(ABC):
+    """조회 기록 저장소 인터페이스"""
+
+    # should_count 가 디스크/네트워크 I/O 를 하는지 (True 면 async 라우트에서 스레드풀로 넘겨 호출)
+    blocking = False
+
+    @abstractmethod
+    def should_count(self, viewer: str, product_id: int) -> bool:
+        """window 안의 첫 조회면 기록하고 True, 이미 조회한 기록이 있으면 False"""
+
+class MemoryViewDedupStore(ViewDedupStore):
+    """TTL 만료 + LRU 제거로 크기가 제한된 프로세스 내 저장소"""
+
+    def __init__(self, window_seconds: float, max_entries: int):
+        self._views = TTLCache(maxsize=max_entries, ttl=window_seconds)
+
+    def should_count(self, viewer: str, product_id: int) -> bool:
+        return self._views.add((viewer, product_id), True)
+
+class SQLiteViewDedupStore(ViewDedupStore):
+    """같은 호스트의 여러 uvicorn 워커가 공유하는 SQLite(WAL) 저장소"""
+
+    # 이 횟수의 기록마다 만료된 기록을 정리
+    PURGE_EVERY = 1000
+
+    blocking = True
+
+    def __init__(self, path: str, window_seconds: float):
+        self.path = path
+        self.window_seconds = window_seconds
+        self._local = threading.local()
+        self._writes = 0
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS product_views ("
+            " viewer TEXT NOT NULL, product_id INTEGER NOT NULL, viewed_at REAL NOT NULL,"
+            " PRIMARY KEY (viewer, product_id)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_product_views_viewed_at ON product_views (viewed_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        """스레드별 연결 (sqlite3 연결은 스레드 간 공유 불가)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def should_count(self, viewer: str, product_id: int) -> bool:
+        now = time.time()
+        conn = self._conn()
+        # 기록이 없거나 window 가 지난 경우에만 삽입/갱신되므로 rowcount 로 판단
+        cursor = conn.execute(
+            "INSERT INTO product_views (viewer, product_id, viewed_at) VALUES (?, ?, ?)"
+            " ON CONFLICT (viewer, product_id) DO UPDATE SET viewed_at = excluded.viewed_at"
+            " WHERE product_views.viewed_at <= ?",
+            (viewer, product_id, now, now - self.window_seconds),
+        )
+        counted = cursor.rowcount == 1
+
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM product_views WHERE viewed_at <= ?", (now - self.window_seconds,))
+        return counted
+
+def create_view_dedup_store() -> ViewDedupStore:
+    """VIEW_DEDUP_BACKEND 설정에 맞는 저장소 생성"""
+    if VIEW_DEDUP_BACKEND == "memory":
+        return MemoryViewDedupStore(VIEW_DEDUP_WINDOW_SECONDS, VIEW_DEDUP_MAX_ENTRIES)
+    if VIEW_DEDUP_BACKEND == "sqlite":
+        return SQLiteViewDedupStore(VIEW_DEDUP_SQLITE_PATH, VIEW_DEDUP_WINDOW_SECONDS)
+    raise ValueError(f"지원하지 않는 VIEW_DEDUP_BACKEND 입니다: {VIEW_DEDUP_BACKEND}")
+
+view_dedup_store = create_view_dedup_store()
@@ -0,0 +1,35 @@
+import pytest
+
+import compression
+from compression import choose_encoding
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0.8, br;q=0.9", "br"),
+    ("BR", "br"),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),
+    ("identity", None),
+    ("", None),
+    ("gzip;q=0, br;q=0", None),
+    ("gzip;q=abc, br;q=0", None),
+])
+def test_choose_encoding_with_brotli(with_brotli, header, expected):
+    assert choose_encoding(header) == expected
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "gzip"),
+    ("br", None),
+    ("*", "gzip"),
+])
+def test_choose_encoding_without_brotli(without_brotli, header, expected):
+    assert choose_encoding(header) == expected
@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+from instrumentation import _loggable_parameters
+
+def context(*compiled_parameters, executemany=False):
+    return SimpleNamespace(compiled=object(), compiled_parameters=list(compiled_parameters), executemany=executemany)
+
+def test_sensitive_parameters_are_redacted_by_name():
+    # asyncpg 는 위치 기반 파라미터를 넘기므로 이름은 컴파일된 파라미터에서 확인
+    parameters = ("user@example.com", "$2b$12$hash", "닉네임", 1)
+    compiled = {"email": "user@example.com", "hashed_password": "$2b$12$hash", "nickname": "닉네임", "param_1": 1}
+
+    assert _loggable_parameters(parameters, context(compiled)) == {
+        "email": "***", "hashed_password": "***", "nickname": "닉네임", "param_1": 1,
+    }
+
+def test_executemany_redacts_every_row():
+    rows = [{"email_1": "a@example.com", "b_count": 1}, {"email_1": "b@example.com", "b_count": 2}]
+
+    assert _loggable_parameters(rows, context(*rows, executemany=True)) == [
+        {"email_1": "***", "b_count": 1}, {"email_1": "***", "b_count": 2},
+    ]
+
+def test_unnamed_parameters_redact_all_strings():
+    # exec_driver_sql 등 컴파일되지 않은 문장은 어떤 값이 민감한지 알 수 없음
+    assert _loggable_parameters(("user@example.com", 3, None), None) == ("***", 3, None)
+    assert _loggable_parameters([{"x": "secret", "n": 1}], SimpleNamespace(compiled=None)) == [{"x": "***", "n": 1}]
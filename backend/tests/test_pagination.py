@@ -0,0 +1,36 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, get_cursor, next_cursor_headers
+
+CREATED_AT = datetime(2026, 10, 18, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(CREATED_AT, 42)
+
+    assert "=" not in cursor  # URL 쿼리에 그대로 넣을 수 있도록 패딩 제거
+    assert decode_cursor(cursor) == (CREATED_AT, 42)
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "WyJ4Il0", "e30"])
+def test_decode_rejects_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_get_cursor_maps_invalid_cursor_to_400():
+    assert asyncio.run(get_cursor(None)) is None
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(get_cursor("not-a-cursor"))
+    assert exc_info.value.status_code == 400
+
+def test_next_cursor_only_for_full_page():
+    items = [SimpleNamespace(created_at=CREATED_AT, product_id=product_id) for product_id in (3, 2)]
+
+    assert next_cursor_headers(items, limit=3) == {}
+    assert next_cursor_headers([], limit=0) == {}
+    headers = next_cursor_headers(items, limit=2)
+    assert decode_cursor(headers[NEXT_CURSOR_HEADER]) == (CREATED_AT, 2)
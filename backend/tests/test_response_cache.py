@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+import response_cache as response_cache_module
+from response_cache import CachedResponse, ResponseCache
+
+def response(body: bytes = b"{}") -> CachedResponse:
+    return CachedResponse(body, {})
+
+@pytest.fixture
+def clock(monkeypatch):
+    """response_cache 가 보는 time.monotonic 을 직접 움직이는 시계"""
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+def test_entry_expires_after_ttl(clock):
+    cache = ResponseCache(max_bytes=1024, ttl=5)
+    cache.set("k", response())
+
+    clock[0] += 4.9
+    assert cache.get("k") == response()
+    clock[0] += 0.1
+    assert cache.get("k") is None
+
+def test_evicts_least_recently_used_over_byte_budget():
+    # 항목 크기 = 키 1 + 본문 9 = 10 바이트, 예산은 3개 분량
+    cache = ResponseCache(max_bytes=30, ttl=60)
+    for key in "abc":
+        cache.set(key, response(b"x" * 9))
+    cache.get("a")  # a 를 최근 사용으로
+
+    cache.set("d", response(b"x" * 9))
+
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+
+def test_skips_entry_larger_than_budget():
+    cache = ResponseCache(max_bytes=10, ttl=60)
+    cache.set("k", response(b"x" * 10))
+    assert cache.get("k") is None
+
+def test_invalidate_removes_only_tagged_entries():
+    cache = ResponseCache(max_bytes=1024, ttl=60)
+    cache.set("list", response(), tags=("product_list",))
+    cache.set("p1", response(), tags=("product:1",))
+    cache.set("p2", response(), tags=("product:2",))
+
+    cache.invalidate("product:1")
+
+    assert cache.get("p1") is None
+    assert cache.get("list") is not None
+    assert cache.get("p2") is not None
+
+def test_build_overlapping_invalidation_is_not_stored():
+    cache = ResponseCache(max_bytes=1024, ttl=60)
+
+    async def build():
+        cache.invalidate("product:1")  # 만드는 도중 쓰기가 일어난 경우
+        return response(b"old")
+
+    result = asyncio.run(cache.get_or_build("p1", ("product:1",), build))
+
+    assert result == response(b"old")  # 요청한 쪽에는 그대로 반환
+    assert cache.get("p1") is None
+
+def test_build_survives_invalidation_of_other_tags():
+    cache = ResponseCache(max_bytes=1024, ttl=60)
+
+    async def build():
+        cache.invalidate("product:2")
+        return response(b"p1")
+
+    asyncio.run(cache.get_or_build("p1", ("product:1",), build))
+
+    assert cache.get("p1") == response(b"p1")
+
+def test_build_overlapping_clear_is_not_stored():
+    cache = ResponseCache(max_bytes=1024, ttl=60)
+
+    async def build():
+        cache.clear()
+        return response()
+
+    asyncio.run(cache.get_or_build("p1", ("product:1",), build))
+
+    assert cache.get("p1") is None
+
+def test_concurrent_misses_share_one_build():
+    cache = ResponseCache(max_bytes=1024, ttl=60)
+    calls = 0
+
+    async def build():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return response(b"shared")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_build("k", (), build) for _ in range(5)))
+
+    assert asyncio.run(main()) == [response(b"shared")] * 5
+    assert calls == 1
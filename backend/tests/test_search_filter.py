@@ -0,0 +1,33 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+import queries
+from models import product_model
+from schemas.product_schema import ProductSearchFilter
+
+def compiled_where(keyword: str) -> tuple[str, dict]:
+    stmt = queries.search_filter(select(product_model.Product.product_id), keyword, ProductSearchFilter())
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+@pytest.mark.parametrize("keyword, pattern", [
+    ("100%", "%100\\%%"),
+    ("a_b", "%a\\_b%"),
+    ("x\\y", "%x\\\\y%"),
+    ("의자", "%의자%"),
+])
+def test_search_keyword_is_matched_literally(keyword, pattern):
+    sql, params = compiled_where(keyword)
+
+    assert "ILIKE" in sql and "ESCAPE" in sql
+    assert set(params.values()) >= {pattern}
+
+def test_price_range_allows_open_and_equal_bounds():
+    assert ProductSearchFilter(min_price=1000).max_price is None
+    assert ProductSearchFilter(min_price=1000, max_price=1000).min_price == 1000
+
+def test_price_range_rejects_min_above_max():
+    with pytest.raises(ValidationError):
+        ProductSearchFilter(min_price=5000, max_price=1000)
@@ -16,6 +16,8 @@ const MySellSection = ({ user }) => {
   const [loading, setLoading] = useState(true); // 로딩 상태
   const [error, setError] = useState(null); // 에러 상태 추가
   const [slideIndex, setSlideIndex] = useState(0); // 현재 슬라이드 인덱스
+  const [nextCursor, setNextCursor] = useState(null); // 다음 페이지 커서 (응답의 X-Next-Cursor, 없으면 마지막 페이지)
+  const [loadingMore, setLoadingMore] = useState(false); // 다음 페이지 로딩 상태
 
   // --- 데이터 로드 (API 호출) ---
   useEffect(() => {
@@ -45,6 +47,7 @@ const MySellSection = ({ user }) => {
                     // 기타 HTTP 오류 처리
                     throw new Error(`판매 내역 로드 실패 (HTTP 상태: ${response.status})`);
                 }
+                setNextCursor(response.headers.get('X-Next-Cursor')); // 다음 페이지가 있으면 커서 저장
                 return response.json(); // 성공 시 JSON 파싱
             })
             .then(data => {
@@ -75,6 +78,7 @@ const MySellSection = ({ user }) => {
 
     } else {
          // 비로그인 상태 처리
+        setNextCursor(null);
         setMySellItems([]); // 판매 내역 비우기
         setLoading(false); // 로딩 상태 해제
     }
@@ -86,7 +90,36 @@ const MySellSection = ({ user }) => {
   };
   const handleNext = () => {
     const lastPossibleIndex = Math.max(0, mySellItems.length - ITEMS_PER_SLIDE);
-    setSlideIndex(prev => Math.min(lastPossibleIndex, prev + 1));
+    const nextIndex = Math.min(lastPossibleIndex, slideIndex + 1);
+    setSlideIndex(nextIndex);
+    // 남은 아이템이 한 화면 분량 이하이면 다음 페이지를 미리 불러옴
+    if (nextIndex + ITEMS_PER_SLIDE * 2 > mySellItems.length) {
+      loadMore();
+    }
+  };
+
+  // --- 다음 페이지 로드 (X-Next-Cursor 로 이어서 요청) ---
+  const loadMore = () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    fetch(`http://localhost:8000/users/me/products?cursor=${encodeURIComponent(nextCursor)}`, { credentials: 'include' })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(`다음 페이지 로드 실패 (HTTP 상태: ${response.status})`);
+        }
+        setNextCursor(response.headers.get('X-Next-Cursor'));
+        return response.json();
+      })
+      .then(data => {
+        if (Array.isArray(data)) {
+          setMySellItems(prev => [...prev, ...data]); // 기존 목록 뒤에 추가
+        }
+      })
+      .catch(err => {
+        // 이미 불러온 목록은 그대로 두고 로그만 남김
+        console.error("MySellSection: 다음 페이지 로딩 중 에러:", err);
+      })
+      .finally(() => setLoadingMore(false));
   };
 
   // --- 로딩 중 표시 ---
@@ -143,7 +176,7 @@ const MySellSection = ({ user }) => {
           </div>
 
           {/* 다음 버튼 */}
-          {mySellItems.length > ITEMS_PER_SLIDE && slideIndex < mySellItems.length - ITEMS_PER_SLIDE && (
+          {(nextCursor || (mySellItems.length > ITEMS_PER_SLIDE && slideIndex < mySellItems.length - ITEMS_PER_SLIDE)) && (
             <button className="carousel-arrow next" onClick={handleNext}>
               <FaArrowRight />
             </button>
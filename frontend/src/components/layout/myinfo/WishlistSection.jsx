@@ -16,6 +16,8 @@ const WishlistSection = ({ user }) => {
   const [loading, setLoading] = useState(true); // 로딩 상태
   const [error, setError] = useState(null); // 에러 상태 추가
   const [slideIndex, setSlideIndex] = useState(0); // 현재 슬라이드 인덱스
+  const [nextCursor, setNextCursor] = useState(null); // 다음 페이지 커서 (응답의 X-Next-Cursor, 없으면 마지막 페이지)
+  const [loadingMore, setLoadingMore] = useState(false); // 다음 페이지 로딩 상태
 
   // --- 데이터 로드 (API 호출) ---
   useEffect(() => {
@@ -38,6 +40,7 @@ const WishlistSection = ({ user }) => {
                     // 404 등 에러 처리
                     throw new Error(`찜 목록 로드 실패 (HTTP 상태: ${response.status})`);
                 }
+                setNextCursor(response.headers.get('X-Next-Cursor')); // 다음 페이지가 있으면 커서 저장
                 return response.json(); // 성공 시 JSON 파싱
             })
             .then(data => {
@@ -65,6 +68,7 @@ const WishlistSection = ({ user }) => {
 
     } else {
         // 비로그인 상태 처리
+        setNextCursor(null);
         setWishlistItems([]); // 찜 목록 비우기
         setLoading(false); // 로딩 상태 해제
         // 필요 시 "로그인 필요" 메시지 표시 가능 (아래 렌더링 부분 참고)
@@ -77,7 +81,36 @@ const WishlistSection = ({ user }) => {
   };
   const handleNext = () => {
     const lastPossibleIndex = Math.max(0, wishlistItems.length - ITEMS_PER_SLIDE);
-    setSlideIndex(prev => Math.min(lastPossibleIndex, prev + 1));
+    const nextIndex = Math.min(lastPossibleIndex, slideIndex + 1);
+    setSlideIndex(nextIndex);
+    // 남은 아이템이 한 화면 분량 이하이면 다음 페이지를 미리 불러옴
+    if (nextIndex + ITEMS_PER_SLIDE * 2 > wishlistItems.length) {
+      loadMore();
+    }
+  };
+
+  // --- 다음 페이지 로드 (X-Next-Cursor 로 이어서 요청) ---
+  const loadMore = () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    fetch(`http://localhost:8000/users/me/likes?cursor=${encodeURIComponent(nextCursor)}`, { credentials: 'include' })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(`다음 페이지 로드 실패 (HTTP 상태: ${response.status})`);
+        }
+        setNextCursor(response.headers.get('X-Next-Cursor'));
+        return response.json();
+      })
+      .then(data => {
+        if (Array.isArray(data)) {
+          setWishlistItems(prev => [...prev, ...data]); // 기존 목록 뒤에 추가
+        }
+      })
+      .catch(err => {
+        // 이미 불러온 목록은 그대로 두고 로그만 남김
+        console.error("WishlistSection: 다음 페이지 로딩 중 에러:", err);
+      })
+      .finally(() => setLoadingMore(false));
   };
 
   // --- 로딩 중 표시 ---
@@ -133,7 +166,7 @@ const WishlistSection = ({ user }) => {
           </div>
 
           {/* 다음 버튼 */}
-          {wishlistItems.length > ITEMS_PER_SLIDE && slideIndex < wishlistItems.length - ITEMS_PER_SLIDE && (
+          {(nextCursor || (wishlistItems.length > ITEMS_PER_SLIDE && slideIndex < wishlistItems.length - ITEMS_PER_SLIDE)) && (
             <button className="carousel-arrow next" onClick={handleNext}>
               <FaArrowRight />
             </button>
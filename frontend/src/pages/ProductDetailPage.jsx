@@ -61,11 +61,11 @@ const ProductDetailPage = ({ user, handleLogout }) => {
                 // 찜 상태 확인
                 if (user) {
                      try {
-                         const likedProductsResponse = await fetch(`http://localhost:8000/users/me/likes`, { credentials: 'include' });
-                         if (likedProductsResponse.ok) {
-                             const likedProductsData = await likedProductsResponse.json();
-                             const likedIds = likedProductsData.map(p => p.product_id);
-                             setIsLiked(likedIds.includes(parseInt(productId)));
+                         // 찜 목록 전체(페이지 단위로 잘림) 대신 이 상품의 찜 여부만 조회
+                         const likeStatusResponse = await fetch(`http://localhost:8000/products/likes?product_ids=${productId}`, { credentials: 'include' });
+                         if (likeStatusResponse.ok) {
+                             const likeStatusData = await likeStatusResponse.json();
+                             setIsLiked(likeStatusData.some(s => s.product_id === parseInt(productId) && s.liked));
                          } else {
                               console.warn("찜 상태 확인 실패");
                               setIsLiked(false);